@@ -1,97 +1,52 @@
-import subprocess
-import re
+import argparse
 import os
 import sys
 from decimal import Decimal, ROUND_HALF_UP
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "experiments"))
+from scheduler import make_grid, read_manifest, schedule
+
 DATA_DIR = "data"
-SCRIPT_TO_RUN = "set_cover_approx.py"
 ALGORITHM_NAME = "Approx"
 CUTOFF_TIME = 600
-RANDOM_SEED = 0
 
 small_datasets = [f"small{i}" for i in range(1, 19)]
 large_datasets = [f"large{i}" for i in range(1, 13)]
 all_datasets = small_datasets + large_datasets
 
-def run_instance(dataset_name):
-    instance_file = os.path.join(DATA_DIR, f"{dataset_name}.in")
-    print(f"--- Running dataset: {dataset_name} ---")
-
-    if not os.path.exists(instance_file):
-        print(f"ERROR: Input file not found: {instance_file}")
-        return None
-
-    command = [
-        sys.executable,
-        SCRIPT_TO_RUN,
-        "-inst", instance_file,
-        "-alg", ALGORITHM_NAME,
-        "-time", str(CUTOFF_TIME),
-        "-seed", str(RANDOM_SEED)
-    ]
-
+def read_optimal_value(dataset_name):
+    out_file = os.path.join(DATA_DIR, f"{dataset_name}.out")
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=False, timeout=CUTOFF_TIME + 60)
-
-        stdout = result.stdout
-        stderr = result.stderr
-
-        if result.returncode != 0:
-            print(f"ERROR: Subprocess for {dataset_name} failed with return code {result.returncode}")
-            print("STDERR:", stderr)
-            return None
-
-        time_match = re.search(r"Greedy algorithm finished in (\d+\.?\d*) seconds", stdout)
-        size_match = re.search(r"Algorithm found cover with (\d+) subsets", stdout)
-        rel_err_match = re.search(r"Relative Error:.*?=\s*(-?\d+\.?\d*)", stdout)
-        if not rel_err_match:
-             rel_err_match = re.search(r"Relative Error: Infinite", stdout)
-
-        time_val = float(time_match.group(1)) if time_match else None
-        size_val = int(size_match.group(1)) if size_match else None
-
-        rel_err_val = None
-        if rel_err_match:
-             if "Infinite" in rel_err_match.group(0):
-                 rel_err_val = float('inf')
-             else:
-                 try:
-                      rel_err_val = float(rel_err_match.group(1))
-                 except (IndexError, ValueError):
-                      rel_err_val = None
-
-        valid_match = re.search(r"Solution is VALID", stdout)
-        if not valid_match:
-             print(f"WARNING: Solution validity check did not pass or wasn't found in output for {dataset_name}.")
-
-        if time_val is None or size_val is None:
-             print(f"ERROR: Failed to parse time or size from output for {dataset_name}. Check script output.")
-             return {
-                 'Dataset': dataset_name,
-                 'Algorithm': ALGORITHM_NAME,
-                 'Time': time_val,
-                 'Size': size_val,
-                 'RelErr': rel_err_val
-             }
-
-        return {
-            'Dataset': dataset_name,
-            'Algorithm': ALGORITHM_NAME,
-            'Time': time_val,
-            'Size': size_val,
-            'RelErr': rel_err_val
-        }
-
-    except subprocess.TimeoutExpired:
-         print(f"ERROR: Subprocess for {dataset_name} timed out after {CUTOFF_TIME + 60} seconds.")
-         return None
-    except FileNotFoundError:
-        print(f"ERROR: Script '{SCRIPT_TO_RUN}' not found. Make sure it's in the correct path.")
+        with open(out_file) as f:
+            return int(f.readline().strip())
+    except (OSError, ValueError):
         return None
-    except Exception as e:
-        print(f"ERROR: An unexpected error occurred while running {dataset_name}: {e}")
+
+def result_row(record):
+    """Table row for one scheduler record, or None if the job did not produce a valid cover."""
+    dataset_name = record['inst']
+    if record['status'] != "ok":
+        print(f"ERROR: {dataset_name} {record['status']}: {record.get('error', '')}")
         return None
+    size_val = record['size']
+    optimal = read_optimal_value(dataset_name)
+    rel_err_val = None
+    if optimal is not None:
+        if optimal > 0:
+            rel_err_val = (size_val - optimal) / optimal
+        elif size_val == 0:
+            rel_err_val = 0.0
+        else:
+            rel_err_val = float('inf')
+    return {
+        'Dataset': dataset_name,
+        'Algorithm': ALGORITHM_NAME,
+        # 贪心本身的用时；旧的 manifest 记录只有作业总用时
+        'Time': record['timings']['solve'] if 'timings' in record else record['elapsed'],
+        'Size': size_val,
+        'RelErr': rel_err_val
+    }
 
 def format_results_latex(results):
     if not results:
@@ -124,15 +79,22 @@ def format_results_latex(results):
     return latex_string
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Approx on all datasets and build the LaTeX table")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Jobs run at once (default: all cores)")
+    args = parser.parse_args()
+
     print("Starting batch run...")
+    # 已有有效 .sol 的数据集不重跑，其结果取自 manifest 中最近的记录
+    schedule(make_grid(all_datasets, [ALGORITHM_NAME], [], [CUTOFF_TIME]), args.workers, DATA_DIR, ".")
+    latest = {r['inst']: r for r in read_manifest(os.path.join("output", "manifest.jsonl"))
+              if r['alg'] == ALGORITHM_NAME and r['time'] == CUTOFF_TIME}
     all_results = []
     for dataset in all_datasets:
-        result_data = run_instance(dataset)
+        result_data = result_row(latest[dataset]) if dataset in latest else None
         if result_data:
             all_results.append(result_data)
         else:
             print(f"Skipping {dataset} due to errors.")
-        print("-" * 30)
 
     print("\nBatch run finished.")
     print("Generating LaTeX table...")
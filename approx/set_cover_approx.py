@@ -1,46 +1,26 @@
 import time
 import argparse
 import os
+import sys
 import math
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.greedy import greedy_cover_csr
+from common.instance import from_rows, load_instance
+from common.reduce import reduce_instance
+from common.solution import check_solution
 
 def read_instance(filename):
-    subsets = []
     try:
-        with open(filename, 'r') as f:
-            first_line = f.readline().strip().split()
-            if len(first_line) != 2:
-                raise ValueError("First line must contain n and m.")
-            n = int(first_line[0])
-            m = int(first_line[1])
-
-            for i in range(m):
-                line = f.readline().strip().split()
-                if not line:
-                     print(f"Warning: Encountered unexpected empty line reading subset {i+1}/{m}.")
-                     subsets.append(set())
-                     continue
-                try:
-                    elements = {int(x) for x in line[1:]}
-                    subsets.append(elements)
-                except (ValueError, IndexError) as e:
-                    print(f"Error parsing line for subset {i+1}: '{' '.join(line)}'. Error: {e}")
-                    raise ValueError(f"Invalid format in subset line {i+2}.")
-
-
-            if len(subsets) != m:
-                print(f"Warning: Read {len(subsets)} subsets, but header specified {m}.")
-                m = len(subsets)
-
-            all_elements_in_subsets = set().union(*subsets)
-            expected_universe = set(range(1, n + 1))
-            if not expected_universe.issubset(all_elements_in_subsets):
-                 uncovered_by_any = expected_universe - all_elements_in_subsets
-                 print(f"Warning: Elements {uncovered_by_any} are not present in any subset. Full cover might be impossible.")
-            invalid_elements = all_elements_in_subsets - expected_universe
-            if invalid_elements:
-                 print(f"Warning: Subsets contain elements outside the universe [1, {n}]: {invalid_elements}")
-
-            return n, m, subsets
+        inst = load_instance(filename)
+
+        degrees = np.diff(inst.elem_offsets)[1:]
+        if (degrees == 0).any():
+             uncovered_by_any = set((np.flatnonzero(degrees == 0) + 1).tolist())
+             print(f"Warning: Elements {uncovered_by_any} are not present in any subset. Full cover might be impossible.")
+
+        return inst
 
     except FileNotFoundError:
         print(f"Error: Input file '{filename}' not found.")
@@ -73,19 +53,18 @@ def read_optimal_value(instance_filename):
         return None
 
 
-def verify_cover(universe_size, subsets_in_cover, all_subsets_map):
-    expected_universe = set(range(1, universe_size + 1))
-    actual_coverage = set()
+def verify_cover(inst, subsets_in_cover):
+    covered = np.zeros(inst.n + 1, dtype=bool)
     for index in subsets_in_cover:
-        if index in all_subsets_map:
-            actual_coverage.update(all_subsets_map[index])
+        if 1 <= index <= inst.m:
+            covered[inst.subset(index - 1)] = True
         else:
             print(f"Error in verification: Index {index} not found in original subsets map.")
             return False
 
-    is_valid = (actual_coverage == expected_universe)
+    is_valid = bool(covered[1:].all())
     if not is_valid:
-        missing_elements = expected_universe - actual_coverage
+        missing_elements = set((np.flatnonzero(~covered[1:]) + 1).tolist())
         print(f"Verification FAILED: The solution does not cover all elements.")
         print(f"Missing elements: {missing_elements}")
     else:
@@ -94,42 +73,20 @@ def verify_cover(universe_size, subsets_in_cover, all_subsets_map):
     return is_valid
 
 
-def greedy_set_cover(universe_size, subsets):
+def greedy_set_cover(inst):
     start_time = time.time()
 
-    universe = set(range(1, universe_size + 1))
-    uncovered_elements = universe.copy()
-    cover_indices = []
-    all_subsets_map = {i + 1: s for i, s in enumerate(subsets)}
-    indexed_subsets = list(all_subsets_map.items())
-
-    while uncovered_elements:
-        best_subset_index = -1
-        elements_added_by_best = set()
-        max_covered_count = -1
-
-        for idx, current_subset in indexed_subsets:
-            newly_covered = current_subset.intersection(uncovered_elements)
-            count = len(newly_covered)
-
-            if count > max_covered_count:
-                max_covered_count = count
-                best_subset_index = idx
-                elements_added_by_best = newly_covered
-
-        if best_subset_index == -1 or max_covered_count == 0:
-            if not uncovered_elements:
-                 break
-            else:
-                 print("Error: Could not cover all elements. Remaining uncovered:", uncovered_elements)
-                 return None, all_subsets_map
-
-        cover_indices.append(best_subset_index)
-        uncovered_elements -= elements_added_by_best
+    chosen = greedy_cover_csr(inst)
+    if chosen is None:
+        degrees = np.diff(inst.elem_offsets)[1:]
+        uncovered_elements = set((np.flatnonzero(degrees == 0) + 1).tolist())
+        print("Error: Could not cover all elements. Remaining uncovered:", uncovered_elements)
+        return None
+    cover_indices = [i + 1 for i in chosen]
 
     end_time = time.time()
     print(f"Greedy algorithm finished in {end_time - start_time:.4f} seconds.")
-    return sorted(cover_indices), all_subsets_map
+    return sorted(cover_indices)
 
 
 def write_solution_file(instance_name, method, cutoff, cover_indices):
@@ -150,6 +107,8 @@ def main():
     parser.add_argument("-alg", required=True, choices=['Approx'], help="Algorithm to use (only Approx supported)")
     parser.add_argument("-time", required=True, type=int, help="Cutoff time in seconds (used for filename)")
     parser.add_argument("-seed", type=int, default=None, help="Random seed (ignored)")
+    parser.add_argument("-reduce", action="store_true", help="Reduce the instance (dominated/essential subsets and elements) first")
+    parser.add_argument("--warm-start", metavar="FILE.sol", help="Keep this cover instead of the greedy one if it is smaller")
 
     args = parser.parse_args()
 
@@ -163,19 +122,36 @@ def main():
     if args.seed is not None:
         print(f"Random Seed: {args.seed} (Note: Approximation algorithm is deterministic)")
 
-    n, m, subsets = read_instance(args.inst)
-    if n is None:
-        exit(1)
+    inst = read_instance(args.inst)
+    n, m = inst.n, inst.m
     print(f"Universe size (n): {n}, Number of subsets (m): {m}")
 
-    cover_indices, all_subsets_map = greedy_set_cover(n, subsets)
+    if args.reduce:
+        kernel = reduce_instance(inst.universe, inst.to_sets())
+        print(f"Reduced instance: {kernel.summary()}")
+        reduced = from_rows(len(kernel.universe), [np.fromiter(s, np.int64, len(s)) for s in kernel.subsets])
+        cover_indices = greedy_set_cover(reduced)
+        if cover_indices is not None:
+            cover_indices = [i + 1 for i in kernel.lift([i - 1 for i in cover_indices])]
+    else:
+        cover_indices = greedy_set_cover(inst)
+
+    if args.warm_start:
+        try:
+            warm = [i + 1 for i in check_solution(args.warm_start, inst)]
+        except (OSError, ValueError) as e:
+            print(f"Error reading warm start '{args.warm_start}': {e}")
+            exit(1)
+        print(f"Warm start: {len(warm)} subsets from {args.warm_start}")
+        if cover_indices is None or len(warm) < len(cover_indices):
+            cover_indices = warm
 
     if cover_indices is not None:
         alg_solution_size = len(cover_indices)
         print(f"Algorithm found cover with {alg_solution_size} subsets.")
 
         print("\n--- Verifying Solution ---")
-        is_valid_cover = verify_cover(n, cover_indices, all_subsets_map)
+        is_valid_cover = verify_cover(inst, cover_indices)
         if not is_valid_cover:
              print("ERROR: The generated solution is INVALID (does not cover the universe).")
         else:
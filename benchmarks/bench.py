@@ -0,0 +1,240 @@
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "bnb"), os.path.join(ROOT, "localsearch")]
+from bnb import branch_and_bound, greedy_set_cover
+from ls_algorithms import run_ls1, run_ls2, run_ls3
+
+HISTORY = os.path.join(ROOT, "benchmarks", "history.json")
+
+# 规模 -> (元素数 n, 子集数 m, 植入覆盖大小 k)
+SIZES = {
+    "small": (300, 150, 15),
+    "medium": (2000, 800, 40),
+    "large": (10000, 3000, 100),
+}
+HIGHER_IS_BETTER = {"iterations_per_sec", "nodes_per_sec"}
+
+
+# ======================== 测试实例 ========================
+def planted_instance(n, m, k, seed=0):
+    """
+    Random instance with a planted cover: k disjoint subsets partition
+    the universe, and m - k random subsets of up to 1.2n/k elements are
+    added. The optimum is at most k, which greedy misses by a wide
+    margin and local search reaches within a second or so; k is the
+    target quality. Returns (universe, subsets, k).
+    """
+    rng = np.random.default_rng(seed)
+    perm = rng.permutation(n) + 1
+    subsets = [set(block.tolist()) for block in np.array_split(perm, k)]
+    for size in rng.integers(1, int(1.2 * n / k) + 1, m - k):
+        subsets.append(set((rng.choice(n, size, replace=False) + 1).tolist()))
+    order = rng.permutation(m)
+    return set(range(1, n + 1)), [subsets[i] for i in order], k
+
+
+def time_to_target(trace, target):
+    """First time the trace reaches a cover of size <= target (inf if never)."""
+    return next((t for t, q in trace if q <= target), math.inf)
+
+
+def summarize(runs):
+    """
+    One value per metric over repeated runs: the best run for speed
+    (fastest greedy, highest rates), which is least disturbed by other
+    load on the machine, and the median otherwise. None where inf.
+    """
+    out = {}
+    for metric in runs[0]:
+        values = [run[metric] for run in runs]
+        if metric in HIGHER_IS_BETTER:
+            value = max(values)
+        elif metric == "seconds":
+            value = min(values)
+        else:
+            value = float(np.median(values))
+        out[metric] = None if math.isinf(value) else round(value, 5)
+    return out
+
+
+# ======================== 基准 ========================
+# 每个基准返回一次运行的指标；重复 repeat 次（LS 用不同种子）后由 summarize 汇总
+def bench_greedy(universe, subsets, k, cutoff, seed):
+    # 像 timeit 一样循环到至少 0.2 s（关闭 GC），取单次平均
+    number, total = timeit.Timer(lambda: greedy_set_cover(universe, subsets)).autorange()
+    return {"seconds": total / number, "size": len(greedy_set_cover(universe, subsets))}
+
+
+def bench_ls(run):
+    def bench(universe, subsets, k, cutoff, seed):
+        stats = {}
+        solution, trace = run(universe, subsets, cutoff, seed, stats=stats)
+        return {
+            "iterations_per_sec": stats["iterations"] / max(stats["seconds"], 1e-9),
+            "time_to_target": time_to_target(trace, k),
+            "size": len(solution),
+        }
+    return bench
+
+
+def bench_bnb(universe, subsets, k, cutoff, seed):
+    _, size, trace, stats = branch_and_bound(universe, subsets, cutoff)
+    return {
+        "nodes_per_sec": stats["nodes_per_sec"] or 0.0,
+        "time_to_target": time_to_target(trace, k),
+        "size": size,
+    }
+
+
+BENCHMARKS = {
+    "greedy": bench_greedy,
+    "ls1": bench_ls(run_ls1),
+    "ls2": bench_ls(run_ls2),
+    "ls3": bench_ls(run_ls3),
+    "bnb": bench_bnb,
+}
+
+
+def run_benchmarks(sizes, solvers, cutoff, repeat):
+    """Results keyed by "<solver>/<size>", each a dict of metrics."""
+    results = {}
+    for size in sizes:
+        universe, subsets, k = planted_instance(*SIZES[size])
+        for solver in solvers:
+            runs = [BENCHMARKS[solver](universe, subsets, k, cutoff, seed) for seed in range(1, repeat + 1)]
+            results[f"{solver}/{size}"] = summarize(runs)
+            print(f"{solver}/{size}: {results[f'{solver}/{size}']}")
+    return results
+
+
+# ======================== 历史记录 ========================
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base, new, threshold, floor=0.01):
+    """
+    Metric-by-metric comparison of two runs. Returns rows of (key,
+    metric, base value, new value, relative change, regressed), the
+    change being positive when the new run is better. time_to_target
+    must also grow by more than `floor` seconds to count as regressed,
+    since a search reaching the target within milliseconds is noisy.
+    """
+    rows = []
+    for key in sorted(set(base["results"]) & set(new["results"])):
+        b_metrics, n_metrics = base["results"][key], new["results"][key]
+        for metric in sorted(set(b_metrics) & set(n_metrics)):
+            b, n = b_metrics[metric], n_metrics[metric]
+            if b is None or n is None:
+                # 只有新的一次没达到目标才算退化
+                rows.append((key, metric, b, n, None, b is not None and n is None))
+                continue
+            if b == 0:
+                change = 0.0 if n == 0 else (math.inf if metric in HIGHER_IS_BETTER else -math.inf)
+            else:
+                change = (n - b) / b if metric in HIGHER_IS_BETTER else (b - n) / b
+            regressed = change < -threshold and (metric != "time_to_target" or n - b > floor)
+            rows.append((key, metric, b, n, change, regressed))
+    return rows
+
+
+def pick(history, ref):
+    """A run by index (negative counts from the end) or by label."""
+    try:
+        index = int(ref)
+    except ValueError:
+        matches = [run for run in history if run.get("label") == ref]
+        if not matches:
+            raise SystemExit(f"No run labelled {ref!r}")
+        return matches[-1]
+    if not -len(history) <= index < len(history):
+        raise SystemExit(f"No run {index}: the history has {len(history)} runs")
+    return history[index]
+
+
+# ======================== main ========================
+def main():
+    parser = argparse.ArgumentParser(description="Set cover solver benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="Run the benchmarks and append them to the history")
+    p.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    p.add_argument("--solvers", nargs="+", default=["greedy", "ls1", "ls2", "bnb"], choices=list(BENCHMARKS))
+    p.add_argument("--time", type=float, default=1.0, help="Cutoff (s) for LS and BnB runs")
+    p.add_argument("--repeat", type=int, default=3,
+                   help="Runs per solver and size, LS with seeds 1..N (default: 3)")
+    p.add_argument("--label", default=None, help="Name for this run, usable with compare")
+
+    p = sub.add_parser("compare", help="Compare two runs and flag regressions")
+    p.add_argument("--base", default="-2", help="Baseline run: index or label (default: second to last)")
+    p.add_argument("--new", default="-1", help="Run to check: index or label (default: last)")
+    p.add_argument("--threshold", type=float, default=0.2,
+                   help="Relative change counted as a regression (default: 0.2)")
+    p.add_argument("--floor", type=float, default=0.01,
+                   help="Smallest increase (s) of time_to_target counted as a regression (default: 0.01)")
+
+    sub.add_parser("list", help="List the runs in the history")
+    for p in sub.choices.values():
+        p.add_argument("--history", default=HISTORY, help="History file (default: benchmarks/history.json)")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    if args.command == "run":
+        run = {
+            "label": args.label,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "cutoff": args.time,
+            "repeat": args.repeat,
+            "results": run_benchmarks(args.sizes, args.solvers, args.time, args.repeat),
+        }
+        history.append(run)
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=2)
+        print(f"Saved run {len(history) - 1} to {args.history}")
+
+    elif args.command == "list":
+        for i, run in enumerate(history):
+            print(f"{i:3d}  {run['timestamp']}  {run.get('commit') or '-':9s}  {run.get('label') or ''}")
+
+    else:
+        if len(history) < 2:
+            raise SystemExit("Need at least two runs to compare")
+        base, new = pick(history, args.base), pick(history, args.new)
+        rows = compare(base, new, args.threshold, args.floor)
+        regressions = [row for row in rows if row[5]]
+        for key, metric, b, n, change, regressed in rows:
+            pct = "" if change is None else f"{100 * change:+.1f}%"
+            print(f"{'REGRESSION' if regressed else '':10s} {key:14s} {metric:20s} {b!s:>10} -> {n!s:>10} {pct}")
+        print(f"{len(regressions)} regression(s) beyond {100 * args.threshold:.0f}%")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
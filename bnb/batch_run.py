@@ -1,6 +1,10 @@
 import os
+import sys
 import argparse
-import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "experiments"))
+from scheduler import make_grid, schedule
 
 def get_target_files(data_dir, prefix, valid_range):
     files = []
@@ -36,28 +40,19 @@ def verify_solution(input_file, sol_file, prefix):
     except Exception as e:
         print(f"⚠️ 比对失败 {sol_file}: {e}")
 
-def batch_run(data_dir, prefix, valid_range, cutoff, script):
+def batch_run(data_dir, prefix, valid_range, cutoff, workers):
     files = get_target_files(data_dir, prefix, valid_range)
     if not files:
         print(f"⚠️ 未找到匹配文件（目录={data_dir}, 前缀={prefix}, 范围={list(valid_range)}）")
         return
 
     print(f" 共找到 {len(files)} 个输入文件：{files}")
-    for filepath in files:
-        instance_name = os.path.splitext(os.path.basename(filepath))[0]
-        sol_file = f"{instance_name}_BnB_{cutoff}.sol"
-        trace_file = f"{instance_name}_BnB_{cutoff}.trace"
-
-        cmd = [
-            "python", script,
-            "-inst", filepath,
-            "-alg", "BnB",
-            "-time", str(cutoff),
-            "-seed", "0"
-        ]
-        print(f"\n 正在执行：{' '.join(cmd)}")
-        subprocess.run(cmd)
+    # 由 scheduler 并行运行，已有有效 .sol 的实例跳过
+    names = [os.path.splitext(os.path.basename(f))[0] for f in files]
+    schedule(make_grid(names, ["BnB"], [], [cutoff]), workers, data_dir, ".")
 
+    for filepath, instance_name in zip(files, names):
+        sol_file = f"{instance_name}_BnB_{cutoff}.sol"
         verify_solution(filepath, sol_file, prefix)
 
 def parse_args():
@@ -66,7 +61,7 @@ def parse_args():
     parser.add_argument("--start", type=int, required=True, help="起始编号")
     parser.add_argument("--end", type=int, required=True, help="结束编号")
     parser.add_argument("--time", type=int, default=600, help="超时（秒）")
-    parser.add_argument("--script", type=str, default="bnb.py", help="主程序脚本（默认 bnb.py）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行作业数（默认 CPU 核数）")
     parser.add_argument("--data", type=str, default="data", help="数据目录（默认 data/）")
     return parser.parse_args()
 
@@ -77,21 +72,5 @@ if __name__ == "__main__":
         prefix=args.prefix,
         valid_range=range(args.start, args.end + 1),
         cutoff=args.time,
-        script=args.script
+        workers=args.workers
     )
-
-
-def greedy_set_cover(universe: Set[int], subsets: List[Set[int]]) -> List[int]:
-    remaining = universe.copy()
-    chosen: List[int] = []
-    while remaining:
-        best_idx = -1
-        best_gain = -1
-        for idx, s in enumerate(subsets):
-            gain = len(s & remaining)
-            if gain > best_gain:        
-                best_idx = idx
-                best_gain = gain
-        chosen.append(best_idx)
-        remaining -= subsets[best_idx]
-    return chosen
@@ -1,46 +1,44 @@
 import time
 import sys
 import os
+import json
 import math
-from typing import List, Set, Tuple
+import heapq
+import itertools
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.greedy import greedy_cover, greedy_cover_csr
+from common.instance import load_instance
+from common.reduce import reduce_instance
+from common.solution import check_solution
+from bounds import make_bounds
+from transposition import TranspositionTable
 
 # ======================== 数据读取 ========================
 def read_input_file(filename: str):
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-    n, m = map(int, lines[0].split())
-    subsets: List[Set[int]] = []
-    for line in lines[1:]:
-        parts = list(map(int, line.strip().split()))
-        subsets.append(set(parts[1:])) 
-    universe = set(range(1, n + 1))
-    return universe, subsets
+    inst = load_instance(filename)
+    subsets: List[Set[int]] = inst.to_sets()
+    return inst.universe, subsets
 
 # ======================== 贪心 ========================
 def greedy_set_cover(universe: Set[int], subsets: List[Set[int]]) -> List[int]:
-    remaining = universe.copy()
-    chosen: List[int] = []
-    while remaining:
-        best_idx = -1
-        best_gain = -1
-        for idx, s in enumerate(subsets):
-            gain = len(s & remaining)
-            if gain > best_gain:
-                best_idx = idx
-                best_gain = gain
-        chosen.append(best_idx)
-        remaining -= subsets[best_idx]
-    return chosen
+    return greedy_cover(universe, subsets)
+
+# ======================== 位编码 ========================
+# 元素按覆盖次数升序编号（覆盖少的放在低位），子集按覆盖元素数降序排列
+# 返回 (排序后的子集位集, 排序后各子集的原下标, 元素位 -> 覆盖它的子集位集)
+PACK_BYTES = 1 << 24   # pack_rows 每批布尔矩阵的大小上限
 
-# ======================== BnB ========================
-def branch_and_bound(universe: Set[int],
-                     subsets: List[Set[int]],
-                     cutoff_time: int):
-    start_time = time.time()
 
-    # === 位编码 ===
-    elem_to_pos = {e: i for i, e in enumerate(sorted(universe))}
-    total_bits = (1 << len(universe)) - 1
+def encode_sets(universe: Set[int], subsets: List[Set[int]]):
+    degree = {e: 0 for e in universe}
+    for s in subsets:
+        for e in s:
+            degree[e] += 1
+    elem_to_pos = {e: i for i, e in enumerate(sorted(universe, key=lambda e: (degree[e], e)))}
     bit_subsets: List[int] = []
     for s in subsets:
         bits = 0
@@ -48,79 +46,362 @@ def branch_and_bound(universe: Set[int],
             bits |= 1 << elem_to_pos[e]
         bit_subsets.append(bits)
 
-    # === 预处理：按覆盖元素数降序 ===
     order = sorted(range(len(subsets)),
-                   key=lambda i: (bit_subsets[i].bit_count(), -i),  
+                   key=lambda i: (bit_subsets[i].bit_count(), -i),
                    reverse=True)
     bit_subsets = [bit_subsets[i] for i in order]
-    orig_index = {new_i: old_i for new_i, old_i in enumerate(order)}
 
-    # === 上界 ===
-    best_solution = sorted(greedy_set_cover(universe, subsets))
-    best_size = len(best_solution)
-    trace: List[Tuple[float, int]] = [(0.0, best_size)]
+    elem_subset_bits = [0] * len(universe)
+    for j, bits in enumerate(bit_subsets):
+        while bits:
+            low = bits & -bits
+            elem_subset_bits[low.bit_length() - 1] |= 1 << j
+            bits ^= low
+    return bit_subsets, order, elem_subset_bits
 
-    # === 下界估计 ===
-    def lower_bound(rem_bits: int, start_idx: int) -> int:
-        if rem_bits == 0:
-            return 0
-        uncovered_cnt = rem_bits.bit_count()
-        max_per_set = 0
-        for i in range(start_idx, len(bit_subsets)):
-            cover_cnt = (bit_subsets[i] & rem_bits).bit_count()
-            max_per_set = max(max_per_set, cover_cnt)
-            if max_per_set == uncovered_cnt:
-                break
-        if max_per_set == 0:
-            return math.inf
-        return math.ceil(uncovered_cnt / max_per_set)
-
-    # === DFS ===
-    def dfs(idx: int, rem_bits: int, chosen_new_idx: List[int]):
-        nonlocal best_solution, best_size
+
+def pack_rows(offsets, cols, width: int) -> List[int]:
+    """CSR rows as Python int bitsets (bit k set for column k)."""
+    rows: List[int] = []
+    n_rows = len(offsets) - 1
+    step = max(1, PACK_BYTES // max(width, 1))
+    for lo in range(0, n_rows, step):
+        hi = min(lo + step, n_rows)
+        mask = np.zeros((hi - lo, width), dtype=bool)
+        mask[np.repeat(np.arange(hi - lo), np.diff(offsets[lo:hi + 1])), cols[offsets[lo]:offsets[hi]]] = True
+        rows += [int.from_bytes(r.tobytes(), "little") for r in np.packbits(mask, axis=1, bitorder="little")]
+    return rows
+
+
+def encode_csr(inst):
+    """encode_sets from the arrays of a CSR Instance, without building its sets."""
+    by_degree = np.argsort(np.diff(inst.elem_offsets)[1:], kind="stable")   # 位置 k 上的元素 - 1
+    pos = np.empty(inst.n + 1, dtype=np.int64)
+    pos[by_degree + 1] = np.arange(inst.n)
+    order = np.lexsort((np.arange(inst.m), -inst.sizes()))
+    rank = np.empty(inst.m, dtype=np.int64)
+    rank[order] = np.arange(inst.m)
+
+    bits = pack_rows(inst.offsets, pos[inst.elems], inst.n)
+    bit_subsets = [bits[i] for i in order.tolist()]
+    elem_bits = pack_rows(inst.elem_offsets[1:], rank[inst.elem_subsets], inst.m)
+    elem_subset_bits = [elem_bits[e] for e in by_degree.tolist()]
+    return bit_subsets, order.tolist(), elem_subset_bits
+
+# ======================== BnB ========================
+# 节点：(idx, rem_bits, path, depth, excluded, warm)
+#   idx       按子集分支时可用子集的起始下标
+#   rem_bits  未覆盖元素
+#   path      (分支子集, 父节点的 path)，不复制已选列表
+#   depth     已选子集数
+#   excluded  按元素分支时被兄弟分支排除的子集
+#   warm      各下界的 warm 状态
+# 分支：(i, idx, excluded)，子节点在真正访问时才由父节点生成
+Node = Tuple[int, int, Optional[tuple], int, int, List[object]]
+Branch = Tuple[int, int, int]
+
+ORDERS = ("dfs", "best", "hybrid")
+MAX_OPEN = 1_000_000   # best-first 开放节点上限，超过后转为 DFS
+CHECK_EVERY = 256      # 每访问这么多节点检查一次时间
+SAMPLE_EVERY = 1.0     # 节点速率采样间隔（秒）
+
+
+class Search:
+    """
+    Branch and bound over bit-encoded subsets. Holds the incumbent and
+    trace; run() explores the subtree under one node depth-first,
+    best-first by bound, or as a depth-first dive followed by
+    best-first, so the same search can be run from the root or on
+    subproblems (parallel BnB).
+    """
+
+    def __init__(self,
+                 universe: Set[int],
+                 subsets: List[Set[int]],
+                 cutoff_time: float,
+                 bounds: Sequence[str] = ("size",),
+                 branching: str = "subset",
+                 start_time: float = None,
+                 upper: List[int] = None,
+                 table_size: int = 0,
+                 progress: float = 0,
+                 inst=None):
+        self.start_time = time.time() if start_time is None else start_time
+        self.cutoff_time = cutoff_time
+        self.branching = branching
+
+        # === 位编码：给了 CSR 实例时直接读它的数组，subsets 可为 None ===
+        if inst is not None:
+            n = inst.n
+            self.bit_subsets, order, self.elem_subset_bits = encode_csr(inst)
+        else:
+            n = len(universe)
+            self.bit_subsets, order, self.elem_subset_bits = encode_sets(universe, subsets)
+        self.total_bits = (1 << n) - 1
+        self.orig_index = {new_i: old_i for new_i, old_i in enumerate(order)}
+
+        # === 上界 ===
+        if upper is None:
+            upper = greedy_cover_csr(inst) if inst is not None else greedy_set_cover(universe, subsets)
+        self.best_solution = sorted(upper)
+        self.best_size = len(self.best_solution)
+        self.trace: List[Tuple[float, int]] = [(0.0, self.best_size)]
+
+        # === 下界估计（按顺序计算，任一下界剪枝即停止） ===
+        self.providers = make_bounds(bounds, self.bit_subsets, n)
+
+        # === 置换表：同一未覆盖状态在不更浅的深度再次出现时直接剪枝 ===
+        self.table = TranspositionTable(table_size) if table_size > 0 else None
+
+        # === 统计 ===
+        self.nodes = 0
+        self.expanded_nodes = 0
+        self.solutions = 0
+        self.max_depth = 0
+        self.timed_out = False
+        self.progress = progress
+        self.sample_every = progress or SAMPLE_EVERY
+        self.next_sample = self.sample_every
+        self.rate: List[Tuple[float, int]] = []
+
+    def root(self) -> Node:
+        return (0, self.total_bits, None, 0, 0, [None] * len(self.providers))
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
+
+    def tick(self):
+        """Periodic check (every CHECK_EVERY nodes): cutoff, rate samples, progress line."""
+        t = self.elapsed()
+        if t > self.cutoff_time:
+            self.timed_out = True
+        if t >= self.next_sample:
+            self.rate.append((round(t, 2), self.nodes))
+            self.next_sample = t + self.sample_every
+            if self.progress:
+                print(f"[{t:8.1f}s] nodes={self.nodes} ({self.nodes / t:.0f}/s) "
+                      f"best={self.best_size} depth<={self.max_depth}", flush=True)
+
+    def child(self, node: Node, branch: Branch, child_warm: List[object]) -> Node:
+        i, idx, excluded = branch
+        return (idx, node[1] & ~self.bit_subsets[i], (i, node[2]), node[3] + 1, excluded, child_warm)
+
+    def improve(self, path) -> bool:
+        chosen_new_idx = []
+        while path is not None:
+            i, path = path
+            chosen_new_idx.append(i)
+        candidate = sorted(self.orig_index[i] for i in chosen_new_idx)
+        if len(candidate) < self.best_size or (len(candidate) == self.best_size and
+                                               (self.best_solution is None or candidate < self.best_solution)):
+            self.best_solution = candidate
+            self.best_size = len(candidate)
+            self.trace.append((self.elapsed(), self.best_size))
+            return True
+        return False
+
+    # === 节点处理：可行解 / 超时 / 剪枝 ===
+    # 返回 (下界, 子节点的 warm 状态)，None 表示不再展开
+    def visit(self, node: Node):
+        idx, rem_bits, path, depth, excluded, warm = node
+        # 超时之后的节点不再处理，也不计入 nodes
+        if not self.timed_out and self.nodes % CHECK_EVERY == 0:
+            self.tick()
+        if self.timed_out:
+            return None
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
 
         if rem_bits == 0:
-            candidate = sorted(orig_index[i] for i in chosen_new_idx)  
-            if len(candidate) < best_size or (len(candidate) == best_size and candidate < best_solution):
-                best_solution = candidate
-                best_size = len(candidate)
-                trace.append((time.time() - start_time, best_size))
-            return
+            self.solutions += 1
+            self.improve(path)
+            return None
 
-        if time.time() - start_time > cutoff_time:
-            return
+        if self.table is not None and self.table.seen((rem_bits, idx, excluded), depth):
+            return None
 
         # 剪枝
-        lb = lower_bound(rem_bits, idx)
-        if len(chosen_new_idx) + lb > best_size:
+        budget = self.best_size - depth
+        best_lb = 0
+        child_warm = []
+        for provider, w in zip(self.providers, warm):
+            t0 = time.perf_counter()
+            lb, w = provider.bound(rem_bits, idx, budget, w, excluded)
+            provider.seconds += time.perf_counter() - t0
+            provider.calls += 1
+            if lb > budget:
+                provider.prunes += 1
+                return None
+            best_lb = max(best_lb, lb)
+            child_warm.append(w)
+        self.expanded_nodes += 1
+        return best_lb, child_warm
+
+    # === 分支 ===
+    def branches(self, node: Node):
+        idx, rem_bits, _, _, excluded, _ = node
+        bit_subsets = self.bit_subsets
+
+        # 按子集顺序：依次尝试 idx 之后与未覆盖元素相交的子集
+        if self.branching != "element":
+            for i in range(idx, len(bit_subsets)):
+                if bit_subsets[i] & rem_bits == 0:
+                    continue
+                yield (i, i + 1, 0)
             return
 
-        for i in range(idx, len(bit_subsets)):
-            if bit_subsets[i] & rem_bits == 0:
+        # 按元素：选可用子集最少的未覆盖元素，只在覆盖它的子集上分支；
+        # 第 k 个分支排除前 k-1 个子集，同一覆盖只会被走到一次
+        branch_bits, best_deg = 0, math.inf
+        bits = rem_bits
+        while bits:
+            low = bits & -bits
+            cands = self.elem_subset_bits[low.bit_length() - 1] & ~excluded
+            deg = cands.bit_count()
+            if deg < best_deg:
+                branch_bits, best_deg = cands, deg
+                if deg <= 1:
+                    break
+            bits ^= low
+
+        while branch_bits:
+            low = branch_bits & -branch_bits
+            yield (low.bit_length() - 1, 0, excluded)
+            excluded |= low
+            branch_bits ^= low
+
+    # === DFS（显式栈）===
+    # 栈帧：(节点, 下界, 子节点 warm, 未尝试的分支)
+    def dfs(self, node: Node, dive: bool = False):
+        """
+        Depth-first search of the subtree under node. With dive=True it
+        stops at the first dead end (leaf or pruned node) and returns
+        the open frames so the caller can continue best-first.
+        """
+        res = self.visit(node)
+        if res is None:
+            return []
+        stack = [(node, res[0], res[1], self.branches(node))]
+        while stack and not self.timed_out:
+            parent, _, child_warm, branches = stack[-1]
+            branch = next(branches, None)
+            if branch is None:
+                stack.pop()
                 continue
-            dfs(i + 1,
-                rem_bits & ~bit_subsets[i],
-                chosen_new_idx + [i])
+            node = self.child(parent, branch, child_warm)
+            res = self.visit(node)
+            if res is None:
+                if dive and not self.timed_out:
+                    return stack
+                continue
+            stack.append((node, res[0], res[1], self.branches(node)))
+            self.expanded(stack)
+        return []
+
+    def expanded(self, stack):
+        """Hook called after each node pushed by dfs()."""
 
-    dfs(0, total_bits, [])
+    # === Best-first ===
+    # 堆元素：(父节点深度 + 下界, -子节点深度, 序号, 父节点, 分支, 子节点 warm)
+    def best_first(self, frames, max_open: int = MAX_OPEN):
+        heap = []
+        seq = itertools.count()
 
-    return best_solution, best_size, trace
+        def push(node, lb, child_warm, branches):
+            key = node[3] + lb
+            for branch in branches:
+                heapq.heappush(heap, (key, -node[3] - 1, next(seq), node, branch, child_warm))
+
+        for node, lb, child_warm, branches in frames:
+            push(node, lb, child_warm, branches)
+        while heap and not self.timed_out:
+            key, _, _, parent, branch, child_warm = heapq.heappop(heap)
+            if key > self.best_size:
+                continue
+            node = self.child(parent, branch, child_warm)
+            if len(heap) >= max_open:
+                self.dfs(node)
+                continue
+            res = self.visit(node)
+            if res is not None:
+                push(node, res[0], res[1], self.branches(node))
+                self.opened(heap)
+
+    def opened(self, heap):
+        """Hook called after each node expanded by best_first()."""
+
+    def run(self, node: Node, order: str = "dfs", max_open: int = MAX_OPEN):
+        """Explore the subtree under node in the given node selection order."""
+        if order not in ORDERS:
+            raise ValueError(f"Unknown node order '{order}'; choose from {ORDERS}")
+        if order == "dfs":
+            self.dfs(node)
+        elif order == "hybrid":
+            self.best_first(self.dfs(node, dive=True), max_open)
+        else:
+            res = self.visit(node)
+            if res is not None:
+                self.best_first([(node, res[0], res[1], self.branches(node))], max_open)
+
+    def stats(self):
+        elapsed = self.elapsed()
+        stats = {
+            "elapsed": round(elapsed, 3),
+            "timed_out": self.timed_out,
+            "nodes": self.nodes,
+            "expanded": self.expanded_nodes,
+            "pruned_by_bound": sum(p.prunes for p in self.providers),
+            "solutions": self.solutions,
+            "improvements": len(self.trace) - 1,
+            "max_depth": self.max_depth,
+            "bound_seconds": round(sum(p.seconds for p in self.providers), 4),
+            "nodes_per_sec": round(self.nodes / elapsed, 1) if elapsed > 0 else None,
+            "rate": self.rate,
+            "bounds": {p.name: p.stats() for p in self.providers},
+        }
+        if self.table is not None:
+            stats["transposition"] = self.table.stats()
+        return stats
+
+
+def branch_and_bound(universe: Set[int],
+                     subsets: List[Set[int]],
+                     cutoff_time: int,
+                     bounds: Sequence[str] = ("size",),
+                     branching: str = "subset",
+                     order: str = "dfs",
+                     max_open: int = MAX_OPEN,
+                     table_size: int = 0,
+                     progress: float = 0,
+                     upper: List[int] = None,
+                     inst=None):
+    search = Search(universe, subsets, cutoff_time, bounds, branching, upper=upper,
+                    table_size=table_size, progress=progress, inst=inst)
+    search.run(search.root(), order, max_open)
+    return search.best_solution, search.best_size, search.trace, search.stats()
 
 # ======================== 输出 ========================
 
-def write_solution_file(filename: str, solution, size: int):
-    os.makedirs("output", exist_ok=True)
-    with open(os.path.join("output", filename), 'w') as f:
+def write_solution_file(filename: str, solution, size: int, out_dir: str = "output"):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, filename), 'w') as f:
         f.write(f"{size}\n")
         f.write(" ".join(str(i + 1) for i in solution) + "\n")
 
 
-def write_trace_file(filename: str, trace):
-    os.makedirs("output", exist_ok=True)
-    with open(os.path.join("outpat", filename), 'w') as f:
+def write_trace_file(filename: str, trace, out_dir: str = "output"):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, filename), 'w') as f:
         for t, val in trace:
             f.write(f"{t:.2f} {val}\n")
 
+
+def write_stats_file(filename: str, stats, out_dir: str = "output"):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, filename), 'w') as f:
+        json.dump(stats, f, indent=2)
+
 # ======================== main ========================
 
 def main():
@@ -132,16 +413,57 @@ def main():
     filename = args[inst_idx]
     algorithm = args[alg_idx]
     cutoff_time = int(args[time_idx])
+    # -bound size,packing,lagrange ：下界按给定顺序计算
+    bounds = args[args.index("-bound") + 1].split(",") if "-bound" in args else ["size"]
+    # -branch subset|element ：按子集顺序或按最难覆盖元素分支
+    branching = args[args.index("-branch") + 1] if "-branch" in args else "subset"
+    # -reduce ：先做实例约简（支配子集/元素、必选子集）
+    reduce = "-reduce" in args
+    # -workers N ：多进程并行 BnB
+    workers = int(args[args.index("-workers") + 1]) if "-workers" in args else 1
+    # -order dfs|best|hybrid ：节点选择顺序；-max_open N ：best-first 开放节点上限
+    order = args[args.index("-order") + 1] if "-order" in args else "dfs"
+    max_open = int(args[args.index("-max_open") + 1]) if "-max_open" in args else MAX_OPEN
+    # -tt N ：置换表最多 N 项（0 关闭）
+    table_size = int(args[args.index("-tt") + 1]) if "-tt" in args else 0
+    # -progress S ：每 S 秒打印一行进度
+    progress = float(args[args.index("-progress") + 1]) if "-progress" in args else 0
+    # --warm-start FILE.sol ：以已有的解作为初始上界
+    warm_start = args[args.index("--warm-start") + 1] if "--warm-start" in args else None
 
     instance_name = os.path.splitext(os.path.basename(filename))[0]
     out_sol = f"{instance_name}_{algorithm}_{cutoff_time}.sol"
     out_trace = f"{instance_name}_{algorithm}_{cutoff_time}.trace"
+    out_stats = f"{instance_name}_{algorithm}_{cutoff_time}.json"
+
+    if workers > 1:
+        from parallel import parallel_branch_and_bound
+        solve = lambda u, s, w, t, i=None: parallel_branch_and_bound(u, s, t, bounds, branching, workers, order,
+                                                                       max_open, table_size, progress, w, i)
+    else:
+        solve = lambda u, s, w, t, i=None: branch_and_bound(u, s, t, bounds, branching, order, max_open,
+                                                              table_size, progress, w, i)
 
-    universe, subsets = read_input_file(filename)
-    solution, size, trace = branch_and_bound(universe, subsets, cutoff_time)
+    # 不化简时直接在 CSR 数组上建位编码和贪心上界，不构造 Python 集合
+    inst = load_instance(filename)
+    upper = check_solution(warm_start, inst) if warm_start else None
+    if reduce:
+        kernel = reduce_instance(inst.universe, inst.to_sets())
+        if upper is not None:
+            upper = kernel.project(upper)
+        # 化简时间计入截止时间
+        solution, size, trace, stats = solve(kernel.universe, kernel.subsets, upper,
+                                             max(cutoff_time - kernel.seconds, 0))
+        solution = kernel.lift(solution)
+        size = len(solution)
+        trace = kernel.lift_trace(trace)
+        stats["reduction"] = kernel.summary()
+    else:
+        solution, size, trace, stats = solve(inst.universe, None, upper, cutoff_time, inst)
 
     write_solution_file(out_sol, solution, size)
     write_trace_file(out_trace, trace)
+    write_stats_file(out_stats, stats)
 
 
 if __name__ == "__main__":
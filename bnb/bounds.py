@@ -0,0 +1,222 @@
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# ======================== 工具 ========================
+def bits_to_mask(bits: int, n_bits: int) -> np.ndarray:
+    """Python int bitset -> boolean array over bit positions."""
+    raw = np.frombuffer(bits.to_bytes((n_bits + 7) // 8 or 1, "little"), np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:n_bits].astype(bool)
+
+
+def bits_to_words(bits: int, n_words: int) -> np.ndarray:
+    """Python int bitset -> little-endian uint64 words."""
+    return np.frombuffer(bits.to_bytes(n_words * 8, "little"), "<u8")
+
+
+def words_matrix(bit_subsets: List[int], n_words: int) -> np.ndarray:
+    """Subset bitsets as an (m, n_words) uint64 matrix, one row per subset."""
+    raw = b"".join(bits.to_bytes(n_words * 8, "little") for bits in bit_subsets)
+    return np.frombuffer(raw, "<u8").reshape(len(bit_subsets), n_words)
+
+
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words: np.ndarray) -> np.ndarray:
+        counts = POPCOUNT8[words.view(np.uint8)]
+        return counts.reshape(*words.shape, 8).sum(axis=-1)
+
+
+def subsets_by_position(bit_subsets: List[int], n_bits: int) -> List[List[int]]:
+    """For each bit position, the (ascending) subset indices containing it."""
+    covering: List[List[int]] = [[] for _ in range(n_bits)]
+    for j, bits in enumerate(bit_subsets):
+        while bits:
+            low = bits & -bits
+            covering[low.bit_length() - 1].append(j)
+            bits ^= low
+    return covering
+
+
+# ======================== 下界 ========================
+class Bound:
+    """
+    A lower bound on the number of subsets still needed to cover
+    rem_bits, using only subsets with index >= start_idx that are not
+    in the excluded bitmask.
+
+    bound() returns (lb, warm): warm is handed to the same provider at
+    the children of the node, so iterative bounds can resume from the
+    parent's state. Providers also count how often they are evaluated,
+    how often they prune, and the time spent in them.
+    """
+    name = ""
+
+    def __init__(self, bit_subsets: List[int], n_bits: int):
+        self.bit_subsets = bit_subsets
+        self.n_bits = n_bits
+        self.calls = 0
+        self.prunes = 0
+        self.seconds = 0.0
+
+    def bound(self, rem_bits: int, start_idx: int, budget: int, warm=None,
+              excluded: int = 0) -> Tuple[float, object]:
+        raise NotImplementedError
+
+    def usable(self, start_idx: int, excluded: int):
+        """Indices of the subsets a bound may use."""
+        if not excluded:
+            return range(start_idx, len(self.bit_subsets))
+        free = ~bits_to_mask(excluded, len(self.bit_subsets))
+        free[:start_idx] = False
+        return np.flatnonzero(free).tolist()
+
+    def stats(self) -> Dict[str, float]:
+        return {"calls": self.calls, "prunes": self.prunes,
+                "seconds": round(self.seconds, 4)}
+
+
+class SizeBound(Bound):
+    """
+    ceil(uncovered / most uncovered elements any one subset covers).
+
+    Subsets are also kept as a uint64 word matrix, so when many subsets
+    remain the AND-and-popcount against the uncovered mask is a few
+    NumPy calls over all of them instead of a Python loop.
+    """
+    name = "size"
+    vector_min = 64                  # 剩余子集少于此数时用 Python 循环
+    max_matrix_bytes = 256 << 20     # 矩阵过大时不建
+
+    def __init__(self, bit_subsets, n_bits):
+        super().__init__(bit_subsets, n_bits)
+        self.n_words = max(1, (n_bits + 63) // 64)
+        self.words = None
+        if len(bit_subsets) * self.n_words * 8 <= self.max_matrix_bytes:
+            self.words = words_matrix(bit_subsets, self.n_words)
+
+    def bound(self, rem_bits, start_idx, budget, warm=None, excluded=0):
+        if rem_bits == 0:
+            return 0, None
+        uncovered_cnt = rem_bits.bit_count()
+        usable = self.usable(start_idx, excluded)
+        if self.words is not None and len(usable) >= self.vector_min:
+            rows = self.words[start_idx:] if not excluded else self.words[usable]
+            covered = popcount(rows & bits_to_words(rem_bits, self.n_words)).sum(axis=1)
+            max_per_set = int(covered.max())
+            if max_per_set == 0:
+                return math.inf, None
+            return math.ceil(uncovered_cnt / max_per_set), None
+
+        max_per_set = 0
+        for i in usable:
+            cover_cnt = (self.bit_subsets[i] & rem_bits).bit_count()
+            max_per_set = max(max_per_set, cover_cnt)
+            if max_per_set == uncovered_cnt:
+                break
+        if max_per_set == 0:
+            return math.inf, None
+        return math.ceil(uncovered_cnt / max_per_set), None
+
+
+class PackingBound(Bound):
+    """
+    Greedy packing of uncovered elements no two of which share a
+    usable subset: each packed element needs a subset of its own.
+    Lower bit positions are tried first.
+    """
+    name = "packing"
+
+    def __init__(self, bit_subsets, n_bits):
+        super().__init__(bit_subsets, n_bits)
+        self.covering = subsets_by_position(bit_subsets, n_bits)
+
+    def bound(self, rem_bits, start_idx, budget, warm=None, excluded=0):
+        lb = 0
+        cand = rem_bits
+        while cand:
+            pos = (cand & -cand).bit_length() - 1
+            reach = 0
+            for j in self.covering[pos]:
+                if j >= start_idx and not (excluded >> j) & 1:
+                    reach |= self.bit_subsets[j]
+            if reach == 0:
+                return math.inf, None
+            lb += 1
+            if lb > budget:
+                break
+            cand &= ~reach
+        return lb, None
+
+
+class LagrangianBound(Bound):
+    """
+    Lagrangian relaxation of the covering constraints,
+        L(u) = sum_e u_e + sum_j min(0, 1 - sum_{e in S_j} u_e),
+    which is a lower bound for any u >= 0. A few subgradient steps are
+    taken per node, starting from the parent's multipliers.
+    """
+    name = "lagrange"
+    iterations = 5
+    step_scale = 1.0
+
+    def __init__(self, bit_subsets, n_bits):
+        super().__init__(bit_subsets, n_bits)
+        ids, pos = [], []
+        for j, bits in enumerate(bit_subsets):
+            p = np.flatnonzero(bits_to_mask(bits, n_bits))
+            pos.append(p)
+            ids.append(np.full(len(p), j, dtype=np.int64))
+        self.pos = np.concatenate(pos) if pos else np.zeros(0, np.int64)
+        self.ids = np.concatenate(ids) if ids else np.zeros(0, np.int64)
+        sizes = np.array([len(p) for p in pos], dtype=float)
+        self.starts = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+        # dual-feasible start: u_e = min over subsets containing e of 1/|S|
+        self.u0 = np.full(n_bits, np.inf)
+        if len(self.pos):
+            np.minimum.at(self.u0, self.pos, 1.0 / sizes[self.ids])
+        self.u0[np.isinf(self.u0)] = 1.0
+
+    def bound(self, rem_bits, start_idx, budget, warm=None, excluded=0):
+        if rem_bits == 0:
+            return 0, None
+        mask = bits_to_mask(rem_bits, self.n_bits)
+        allowed = True
+        if excluded:
+            allowed = ~bits_to_mask(excluded, len(self.bit_subsets))[start_idx:]
+        u = (self.u0 if warm is None else warm) * mask
+        lo = self.starts[start_idx]
+        pos, ids = self.pos[lo:], self.ids[lo:] - start_idx
+        n_sets = len(self.bit_subsets) - start_idx
+
+        best = 0.0
+        for _ in range(self.iterations):
+            reduced = 1.0 - np.bincount(ids, weights=u[pos], minlength=n_sets)
+            take = (reduced < 0) & allowed
+            value = u.sum() + reduced[take].sum()
+            best = max(best, value)
+            if math.ceil(best - 1e-6) > budget:
+                break
+            # subgradient: 1 - (number of taken subsets covering e)
+            g = (1 - np.bincount(pos[take[ids]], minlength=self.n_bits)) * mask
+            norm = float((g * g).sum())
+            if norm == 0:
+                break
+            step = self.step_scale * max(budget + 1 - value, 0.1) / norm
+            u = np.maximum(u + step * g, 0.0)
+        return math.ceil(best - 1e-6), u
+
+
+BOUNDS = {cls.name: cls for cls in (SizeBound, PackingBound, LagrangianBound)}
+
+
+def make_bounds(names: Sequence[str], bit_subsets: List[int], n_bits: int) -> List[Bound]:
+    """Instantiate bound providers, evaluated in the given order."""
+    unknown = [n for n in names if n not in BOUNDS]
+    if unknown:
+        raise ValueError(f"Unknown bound(s) {unknown}; choose from {sorted(BOUNDS)}")
+    return [BOUNDS[n](bit_subsets, n_bits) for n in names]
@@ -0,0 +1,262 @@
+import heapq
+import multiprocessing as mp
+import queue
+import time
+from collections import deque
+from typing import List, Sequence, Set
+
+from bnb import MAX_OPEN, Search
+
+SPLIT_FACTOR = 4      # 初始子问题数 = SPLIT_FACTOR * workers
+DONATE_DEPTH = 8      # 只在浅层节点把剩余分支分给空闲 worker
+DONATE_OPEN = 16      # best-first 每次最多分出的开放节点数
+GRACE = 5.0           # 超时后等待 worker 退出的时间
+
+
+# ======================== 共享上界 ========================
+class SharedSearch(Search):
+    """
+    Search that prunes against an incumbent size kept in shared memory
+    and publishes its own improvements to a results queue, so it can
+    run alongside other solvers working on the same instance.
+    """
+
+    def __init__(self, universe, subsets, cutoff_time, bounds, branching, start_time, upper, table_size,
+                 best_value, lock, results, inst=None):
+        super().__init__(universe, subsets, cutoff_time, bounds, branching, start_time, upper, table_size,
+                         inst=inst)
+        self.best_value, self.lock, self.results = best_value, lock, results
+
+    def visit(self, node):
+        best = self.best_value.value
+        if best < self.best_size:
+            self.best_size, self.best_solution = best, None
+        return super().visit(node)
+
+    def improve(self, chosen_new_idx):
+        if not super().improve(chosen_new_idx):
+            return False
+        with self.lock:
+            if self.best_size < self.best_value.value:
+                self.best_value.value = self.best_size
+        self.results.put(("solution", self.trace[-1][0], self.best_solution))
+        return True
+
+
+# ======================== Worker ========================
+class WorkerSearch(SharedSearch):
+    """
+    Search inside a worker process: a SharedSearch that also hands work
+    to the queue when another worker is idle (work stealing): the
+    untried siblings of a shallow node in depth-first search, the best
+    open nodes in best-first search.
+    """
+
+    def __init__(self, universe, subsets, cutoff_time, bounds, branching, start_time, upper, table_size, shared,
+                 inst=None):
+        best_value, lock, self.idle, self.pending, self.tasks, results, self.workers = shared
+        super().__init__(universe, subsets, cutoff_time, bounds, branching, start_time, upper, table_size,
+                         best_value, lock, results, inst)
+        self.donated = 0
+
+    def hungry(self) -> bool:
+        # 有空闲 worker 且队列已空（未完成任务数 = 排队 + 正在运行）
+        idle = self.idle.value
+        return idle > 0 and self.pending.value + idle <= self.workers
+
+    def expanded(self, stack):
+        if not self.hungry():
+            return
+        # 把最浅一层还有剩余分支的栈帧整体分出去
+        for k, (node, lb, child_warm, branches) in enumerate(stack):
+            if node[3] >= DONATE_DEPTH:
+                return
+            rest = [self.child(node, br, child_warm) for br in branches]
+            if rest:
+                stack[k] = (node, lb, child_warm, iter(()))
+                with self.lock:
+                    self.pending.value += len(rest)
+                for c in rest:
+                    self.tasks.put(c)
+                self.donated += len(rest)
+                return
+
+    def opened(self, heap):
+        if not self.hungry() or len(heap) < 2:
+            return
+        # 分出堆顶最有希望的一批开放节点（至多一半），自己保留其余的
+        rest = []
+        for _ in range(min(DONATE_OPEN, len(heap) // 2)):
+            key, _, _, parent, branch, child_warm = heapq.heappop(heap)
+            if key <= self.best_size:
+                rest.append(self.child(parent, branch, child_warm))
+        with self.lock:
+            self.pending.value += len(rest)
+        for c in rest:
+            self.tasks.put(c)
+        self.donated += len(rest)
+
+
+def worker(universe, subsets, cutoff_time, bounds, branching, order, max_open, table_size,
+           start_time, upper, shared, inst):
+    search = WorkerSearch(universe, subsets, cutoff_time, bounds, branching, start_time, upper,
+                          table_size, shared, inst)
+    lock, idle, pending, tasks = search.lock, search.idle, search.pending, search.tasks
+    while True:
+        with lock:
+            idle.value += 1
+        node = tasks.get()
+        with lock:
+            idle.value -= 1
+        if node is None:
+            break
+        search.run(node, order, max_open)
+        with lock:
+            pending.value -= 1
+    stats = search.stats()
+    stats["donated"] = search.donated
+    search.results.put(("stats", stats))
+
+
+# ======================== 并行 BnB ========================
+SUMMED = ("nodes", "expanded", "pruned_by_bound", "solutions", "bound_seconds", "donated")
+
+
+def merge_rates(a, b):
+    """
+    Sum of two (time, nodes so far) series sampled at different times:
+    at each sample time, each series contributes its last count.
+    """
+    merged, i, j, last_a, last_b = [], 0, 0, 0, 0
+    while i < len(a) or j < len(b):
+        if j == len(b) or (i < len(a) and a[i][0] <= b[j][0]):
+            t, last_a = a[i]
+            i += 1
+        else:
+            t, last_b = b[j]
+            j += 1
+        if merged and merged[-1][0] == t:
+            merged.pop()
+        merged.append((t, last_a + last_b))
+    return merged
+
+
+def merge_stats(total, stats):
+    total["rate"] = merge_rates(total["rate"], stats["rate"])
+    for key in SUMMED:
+        total[key] = round(total.get(key, 0) + stats.get(key, 0), 4)
+    total["max_depth"] = max(total["max_depth"], stats["max_depth"])
+    total["timed_out"] = total["timed_out"] or stats["timed_out"]
+    for name, s in stats["bounds"].items():
+        acc = total["bounds"].setdefault(name, {"calls": 0, "prunes": 0, "seconds": 0.0})
+        for key in acc:
+            acc[key] = round(acc[key] + s[key], 4)
+    if "transposition" in stats:
+        acc = total.setdefault("transposition", {})
+        for key, value in stats["transposition"].items():
+            if key != "hit_rate":
+                acc[key] = acc.get(key, 0) + value
+        lookups = acc["hits"] + acc["misses"] + acc["updates"]
+        acc["hit_rate"] = round(acc["hits"] / lookups, 4) if lookups else 0.0
+
+
+def parallel_branch_and_bound(universe: Set[int],
+                              subsets: List[Set[int]],
+                              cutoff_time: int,
+                              bounds: Sequence[str] = ("size",),
+                              branching: str = "subset",
+                              workers: int = 2,
+                              order: str = "dfs",
+                              max_open: int = MAX_OPEN,
+                              table_size: int = 0,
+                              progress: float = 0,
+                              upper: List[int] = None,
+                              inst=None):
+    """
+    Branch and bound on several processes. The top of the tree is
+    expanded breadth-first into subproblems that workers take from a
+    shared queue; the incumbent size lives in shared memory so every
+    worker prunes against the global best. Returns the same values as
+    branch_and_bound, with the trace merged over all workers.
+    """
+    start_time = time.time()
+    search = Search(universe, subsets, cutoff_time, bounds, branching, start_time, upper, inst=inst)
+
+    # === 拆分：广度优先展开到足够多的子问题 ===
+    frontier = deque([search.root()])
+    while frontier and len(frontier) < SPLIT_FACTOR * workers:
+        node = frontier.popleft()
+        res = search.visit(node)
+        if res is not None:
+            frontier.extend(search.child(node, br, res[1]) for br in search.branches(node))
+
+    stats = search.stats()
+    stats.update({"workers": workers, "subproblems": len(frontier)})
+    if not frontier:
+        return search.best_solution, search.best_size, search.trace, stats
+
+    ctx = mp.get_context()
+    best_value = ctx.RawValue('i', search.best_size)
+    idle = ctx.RawValue('i', 0)
+    pending = ctx.RawValue('i', len(frontier))
+    lock = ctx.Lock()
+    tasks, results = ctx.Queue(), ctx.Queue()
+    shared = (best_value, lock, idle, pending, tasks, results, workers)
+    for node in frontier:
+        tasks.put(node)
+
+    procs = [ctx.Process(target=worker,
+                         args=(universe, subsets, cutoff_time, bounds, branching, order, max_open,
+                               table_size, start_time, search.best_solution, shared, inst),
+                         daemon=True)
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+
+    # === 收集各 worker 的解，直到所有子问题完成或超时 ===
+    found = []
+    finished = 0
+
+    def handle(msg):
+        nonlocal finished
+        if msg[0] == "solution":
+            found.append(msg[1:])
+        else:
+            merge_stats(stats, msg[1])
+            finished += 1
+
+    deadline = start_time + cutoff_time + GRACE
+    next_print = progress
+    while pending.value > 0 and time.time() < deadline:
+        try:
+            handle(results.get(timeout=0.1))
+        except queue.Empty:
+            pass
+        if progress and time.time() - start_time >= next_print:
+            next_print += progress
+            print(f"[{time.time() - start_time:8.1f}s] best={best_value.value} "
+                  f"open subproblems={pending.value}", flush=True)
+    for _ in procs:
+        tasks.put(None)
+    while finished < workers and time.time() < deadline + GRACE:
+        try:
+            handle(results.get(timeout=0.1))
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                break
+    for p in procs:
+        p.join(timeout=1)
+        if p.is_alive():
+            p.terminate()
+
+    stats["elapsed"] = round(time.time() - start_time, 3)
+    stats["nodes_per_sec"] = round(stats["nodes"] / stats["elapsed"], 1)
+
+    # === 按时间合并 trace ===
+    for t, candidate in sorted(found, key=lambda f: f[0]):
+        if len(candidate) < search.best_size or (len(candidate) == search.best_size and
+                                                 candidate < search.best_solution):
+            search.best_solution, search.best_size = candidate, len(candidate)
+            search.trace.append((t, search.best_size))
+    stats["improvements"] = len(search.trace) - 1
+    return search.best_solution, search.best_size, search.trace, stats
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """
+    Bounded memo of search states (uncovered bits, start index, excluded
+    subsets) -> smallest depth at which the state was reached. The
+    subtree under a state only depends on the state, so reaching it
+    again at an equal or greater depth cannot lead to a smaller cover.
+    Least recently used entries are evicted once max_entries is hit.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+        self.evictions = 0
+
+    def seen(self, key, depth: int) -> bool:
+        """True if key was already reached at depth <= depth; records it otherwise."""
+        table = self.table
+        best = table.get(key)
+        if best is not None:
+            table.move_to_end(key)
+            if best <= depth:
+                self.hits += 1
+                return True
+            table[key] = depth
+            self.updates += 1
+            return False
+        self.misses += 1
+        table[key] = depth
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
+            self.evictions += 1
+        return False
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.updates
+        return {"entries": len(self.table), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses, "updates": self.updates,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
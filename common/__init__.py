@@ -0,0 +1,3 @@
+"""
+Code shared by the BnB, approximation and local search solvers.
+"""
@@ -0,0 +1,61 @@
+import heapq
+
+import numpy as np
+
+
+def greedy_cover(universe, subsets):
+    """
+    Greedy set cover: repeatedly pick the subset covering the most
+    uncovered elements, ties broken on the lowest index.
+
+    Gains only ever shrink, so the stale gains kept in a max-heap are
+    upper bounds; a subset is re-evaluated only when it reaches the top
+    (lazy greedy). Returns the chosen 0-based indices in pick order, or
+    None if the subsets cannot cover the universe.
+    """
+    remaining = set(universe)
+    heap = [(-len(s & remaining), i) for i, s in enumerate(subsets)]
+    heapq.heapify(heap)
+    chosen = []
+    while remaining:
+        if not heap:
+            return None
+        _, i = heapq.heappop(heap)
+        gain = len(subsets[i] & remaining)
+        if gain == 0:
+            continue
+        # still ahead of every other (upper-bounded) gain: take it
+        if heap and (-gain, i) > heap[0]:
+            heapq.heappush(heap, (-gain, i))
+            continue
+        chosen.append(i)
+        remaining -= subsets[i]
+    return chosen
+
+
+def greedy_cover_csr(inst):
+    """
+    greedy_cover on a CSR Instance (universe 1..n), reading its arrays
+    instead of Python sets. Picks the same subsets in the same order.
+    """
+    offsets, elems = inst.offsets.tolist(), inst.elems
+    covered = np.zeros(inst.n + 1, dtype=bool)
+    remaining = inst.n
+    heap = [(offsets[i] - offsets[i + 1], i) for i in range(inst.m)]
+    heapq.heapify(heap)
+    chosen = []
+    while remaining:
+        if not heap:
+            return None
+        _, i = heapq.heappop(heap)
+        row = elems[offsets[i]:offsets[i + 1]]
+        gain = len(row) - int(np.count_nonzero(covered[row]))
+        if gain == 0:
+            continue
+        if heap and (-gain, i) > heap[0]:
+            heapq.heappush(heap, (-gain, i))
+            continue
+        chosen.append(i)
+        covered[row] = True
+        remaining -= gain
+    return chosen
@@ -0,0 +1,263 @@
+import os
+import numpy as np
+
+CACHE_EXT = ".csr"
+CACHE_MAGIC = b"SCCSR\x00\x01\x00"
+# magic, then n, m, nnz, source size, source mtime (ns) as int64
+HEADER_SIZE = len(CACHE_MAGIC) + 5 * 8
+
+
+class Instance:
+    """
+    Set cover instance in compressed sparse row form.
+
+    Subset i (0-based) holds elems[offsets[i]:offsets[i+1]], sorted and
+    without duplicates. The transposed index lists, for element e
+    (1-based), the 0-based subsets covering it in
+    elem_subsets[elem_offsets[e]:elem_offsets[e+1]].
+    """
+
+    def __init__(self, n, offsets, elems, elem_offsets=None, elem_subsets=None):
+        self.n = int(n)
+        self.m = len(offsets) - 1
+        self.offsets = offsets
+        self.elems = elems
+        if elem_offsets is None:
+            elem_offsets, elem_subsets = transpose(self.n, offsets, elems)
+        self.elem_offsets = elem_offsets
+        self.elem_subsets = elem_subsets
+        self._sets = None
+
+    @property
+    def nnz(self):
+        return len(self.elems)
+
+    @property
+    def universe(self):
+        return set(range(1, self.n + 1))
+
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def subset(self, i):
+        return self.elems[self.offsets[i]:self.offsets[i + 1]]
+
+    def covering(self, e):
+        return self.elem_subsets[self.elem_offsets[e]:self.elem_offsets[e + 1]]
+
+    def to_sets(self):
+        """
+        Subsets as a list of Python sets, the form the local searches
+        work on. Built on the first call and shared afterwards, so
+        callers must not modify them.
+        """
+        if self._sets is None:
+            elems = self.elems.tolist()
+            offsets = self.offsets.tolist()
+            self._sets = [set(elems[offsets[i]:offsets[i + 1]]) for i in range(self.m)]
+        return self._sets
+
+
+def transpose(n, offsets, elems):
+    """
+    Build the element -> subsets index of a CSR instance.
+    """
+    rows = np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets))
+    order = np.argsort(elems, kind="stable")
+    counts = np.bincount(elems, minlength=n + 1)
+    elem_offsets = np.zeros(n + 2, dtype=np.int64)
+    np.cumsum(counts, out=elem_offsets[1:])
+    return elem_offsets, rows[order]
+
+
+def from_rows(n, rows):
+    """
+    Build an Instance from per-subset integer arrays, dropping repeated
+    elements within a subset.
+    """
+    lengths = np.array([len(r) for r in rows], dtype=np.int64)
+    elems = np.concatenate(rows).astype(np.int32) if rows else np.zeros(0, np.int32)
+    return from_lengths(n, lengths, elems)
+
+
+def from_lengths(n, lengths, elems):
+    """
+    Build an Instance from the subset sizes and their elements laid out
+    back to back, sorting each subset and dropping repeated elements.
+    """
+    if elems.size and (elems.min() < 1 or elems.max() > n):
+        raise ValueError(f"Subsets contain elements outside the universe [1, {n}].")
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    # rows that are already strictly increasing need no sorting
+    step = np.diff(elems) > 0
+    cross = offsets[1:-1] - 1
+    step[cross[(cross >= 0) & (cross < len(step))]] = True
+    if step.all():
+        return Instance(n, offsets, elems)
+
+    ids = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+    order = np.lexsort((elems, ids))
+    elems, ids = elems[order], ids[order]
+    keep = np.ones(len(elems), dtype=bool)
+    keep[1:] = (elems[1:] != elems[:-1]) | (ids[1:] != ids[:-1])
+    elems, ids = elems[keep], ids[keep]
+    np.cumsum(np.bincount(ids, minlength=len(lengths)), out=offsets[1:])
+    return Instance(n, offsets, elems)
+
+
+CHUNK_SIZE = 1 << 22                            # bytes read at a time
+POW10 = 10 ** np.arange(19, dtype=np.int64)
+BLANK = np.zeros(256, dtype=bool)
+BLANK[[9, 10, 11, 12, 13, 32]] = True
+
+
+def parse_numbers(buf):
+    """
+    Parse a block of whole lines of non-negative integers. Returns the
+    numbers in order and, for every line holding any, how many it
+    holds. Lines whose first non-blank character is '#' are skipped.
+    """
+    a = np.frombuffer(buf, dtype=np.uint8)
+    newlines = np.flatnonzero(a == 10)
+    digit = (a >= 48) & (a <= 57)
+    pos = np.flatnonzero(digit)
+
+    other = np.flatnonzero(~digit & ~BLANK[a])
+    if len(other):
+        solid = np.flatnonzero(~BLANK[a])
+        solid_line = np.searchsorted(newlines, solid)
+        lead = np.r_[True, solid_line[1:] != solid_line[:-1]]
+        comment = solid_line[lead & (a[solid] == ord("#"))]
+        bad = ~np.isin(np.searchsorted(newlines, other), comment)
+        if bad.any():
+            k = other[np.argmax(bad)]
+            raise ValueError(f"Unexpected character {chr(a[k])!r} in instance file.")
+        pos = pos[~np.isin(np.searchsorted(newlines, pos), comment)]
+    if not len(pos):
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+
+    # digit runs -> numbers: sum of digit * 10^(digits after it in its run)
+    start = np.r_[True, np.diff(pos) != 1]
+    first = np.flatnonzero(start)
+    last = np.r_[first[1:], len(pos)] - 1
+    if (last - first).max() >= len(POW10):
+        raise ValueError("Number too large in instance file.")
+    run = np.cumsum(start) - 1
+    digits = (a[pos] - 48).astype(np.int64) * POW10[last[run] - np.arange(len(pos))]
+    values = np.add.reduceat(digits, first)
+
+    line = np.searchsorted(newlines, pos[first])
+    bounds = np.flatnonzero(np.r_[True, line[1:] != line[:-1], True])
+    return values, np.diff(bounds)
+
+
+def parse_instance(fname, chunk_size=CHUNK_SIZE):
+    """
+    Parse a text .in file: a "n m" header, then one line per subset
+    whose first number is its size, followed by its elements.
+
+    The file is read in chunks of whole lines and each chunk's numbers
+    are converted in bulk, so memory stays close to the CSR arrays
+    being built rather than a multiple of the file size.
+    """
+    n = None
+    elems, lengths = [], []
+    rest = b""
+    with open(fname, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            data = rest + chunk
+            cut = data.rfind(b"\n") + 1 if chunk else len(data)
+            if chunk and cut == 0:
+                rest = data
+                continue
+            block, rest = data[:cut], data[cut:]
+            values, counts = parse_numbers(block)
+            if n is None and len(counts):
+                if counts[0] != 2:
+                    raise ValueError("First line must contain n and m.")
+                n = int(values[0])
+                values, counts = values[2:], counts[1:]
+            # drop each line's leading size field
+            keep = np.ones(len(values), dtype=bool)
+            keep[np.cumsum(counts) - counts] = False
+            values = values[keep]
+            if values.size and (values.min() < 1 or values.max() > n):
+                raise ValueError(f"Subsets contain elements outside the universe [1, {n}].")
+            elems.append(values.astype(np.int32))
+            lengths.append(counts - 1)
+            if not chunk:
+                break
+    if n is None:
+        raise ValueError("First line must contain n and m.")
+    return from_lengths(n, np.concatenate(lengths), np.concatenate(elems))
+
+
+def cache_path(fname):
+    return os.path.splitext(fname)[0] + CACHE_EXT
+
+
+def save_cache(inst, path, src_stat):
+    """
+    Write an instance as a flat binary file: header, then offsets,
+    elems, elem_offsets and elem_subsets, each 8-byte aligned.
+    """
+    header = np.array([inst.n, inst.m, inst.nnz, src_stat.st_size, src_stat.st_mtime_ns],
+                      dtype=np.int64)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(header.tobytes())
+        for arr, dtype in ((inst.offsets, np.int64), (inst.elems, np.int32),
+                           (inst.elem_offsets, np.int64), (inst.elem_subsets, np.int32)):
+            data = np.ascontiguousarray(arr, dtype=dtype).tobytes()
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(tmp, path)
+
+
+def read_cache(path, src_stat=None):
+    """
+    Memory-map a cached instance. Returns None if the file is missing,
+    malformed, or was built from a different version of the source.
+    """
+    try:
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+    except (OSError, ValueError):
+        return None
+    if len(buf) < HEADER_SIZE or bytes(buf[:len(CACHE_MAGIC)]) != CACHE_MAGIC:
+        return None
+    n, m, nnz, size, mtime = np.frombuffer(buf, np.int64, 5, len(CACHE_MAGIC)).tolist()
+    if src_stat is not None and (size, mtime) != (src_stat.st_size, src_stat.st_mtime_ns):
+        return None
+
+    pos = HEADER_SIZE
+    arrays = []
+    for count, dtype in ((m + 1, np.int64), (nnz, np.int32),
+                         (n + 2, np.int64), (nnz, np.int32)):
+        nbytes = count * np.dtype(dtype).itemsize
+        if pos + nbytes > len(buf):
+            return None
+        arrays.append(np.frombuffer(buf, dtype, count, pos))
+        pos += nbytes + (-nbytes % 8)
+    return Instance(n, *arrays)
+
+
+def load_instance(fname, use_cache=True):
+    """
+    Load an instance, going through the binary cache next to the .in
+    file when it is up to date and refreshing it otherwise.
+    """
+    if not use_cache:
+        return parse_instance(fname)
+    src_stat = os.stat(fname)
+    path = cache_path(fname)
+    inst = read_cache(path, src_stat)
+    if inst is None:
+        inst = parse_instance(fname)
+        try:
+            save_cache(inst, path, src_stat)
+        except OSError:
+            pass
+    return inst
@@ -0,0 +1,147 @@
+import time
+
+from common.greedy import greedy_cover
+
+DOMINANCE_DEGREE = 8    # 元素支配只检查被至多这么多个子集覆盖的元素
+
+
+class Kernel:
+    """
+    A reduced set cover instance together with what is needed to map
+    its solutions back to the original one.
+
+    universe/subsets are renumbered (elements 1..n', subsets 0..m'-1);
+    subset_ids[k] is the original 0-based id of kernel subset k and
+    forced holds the original ids of subsets every cover must contain.
+    """
+
+    def __init__(self, universe, subsets, subset_ids, forced, removed, seconds):
+        self.universe = universe
+        self.subsets = subsets
+        self.subset_ids = subset_ids
+        self.forced = forced
+        self.removed = removed
+        self.seconds = seconds
+
+    def lift(self, solution):
+        """Kernel solution (0-based ids) -> sorted original 0-based ids."""
+        return sorted(self.forced + [self.subset_ids[k] for k in solution])
+
+    def project(self, solution):
+        """
+        Original cover (0-based ids) -> kernel cover (kernel ids). Subsets
+        the reduction removed are dropped, and the kernel elements they
+        leave uncovered are covered greedily.
+        """
+        position = {i: k for k, i in enumerate(self.subset_ids)}
+        cover = [position[i] for i in solution if i in position]
+        left = set(self.universe).difference(*(self.subsets[k] for k in cover))
+        if left:
+            extra = greedy_cover(left, self.subsets)
+            if extra is None:
+                raise ValueError("The reduced instance cannot be covered.")
+            cover += extra
+        return sorted(set(cover))
+
+    def lift_trace(self, trace):
+        """Shift (time, size) pairs by the reduction time and forced subsets."""
+        return [(t + self.seconds, q + len(self.forced)) for t, q in trace]
+
+    def summary(self):
+        return {"forced": len(self.forced),
+                "subsets": len(self.subsets),
+                "elements": len(self.universe),
+                **self.removed,
+                "seconds": round(self.seconds, 4)}
+
+
+def reduce_instance(universe, subsets):
+    """
+    Apply the standard set cover reductions until none fires:
+
+    - essential subsets: the only subset covering some element is forced
+      into the cover and its elements are dropped;
+    - duplicate / dominated subsets: a subset contained in another one
+      is dropped (of equal subsets the lowest index is kept);
+    - dominated elements: if every subset covering e also covers f,
+      covering e covers f, so f is dropped. Only elements covered by at
+      most DOMINANCE_DEGREE subsets are tested, which bounds the cost of
+      this rule on large instances.
+
+    Optimal covers of the kernel plus the forced subsets are optimal
+    covers of the original instance.
+    """
+    start = time.time()
+    sets = {i: set(s) & universe for i, s in enumerate(subsets)}
+    covering = {e: set() for e in universe}
+    for i, s in sets.items():
+        for e in s:
+            covering[e].add(i)
+    forced = []
+    removed = {"dominated_subsets": 0, "dominated_elements": 0}
+
+    def drop_element(e):
+        for j in covering.pop(e):
+            sets[j].discard(e)
+
+    def drop_subset(i):
+        for e in sets.pop(i):
+            covering[e].discard(i)
+
+    changed = True
+    while changed:
+        changed = False
+
+        # essential subsets
+        for e in sorted(covering):
+            if e in covering and len(covering[e]) == 1:
+                (i,) = covering[e]
+                forced.append(i)
+                for f in list(sets[i]):
+                    drop_element(f)
+                drop_subset(i)
+                changed = True
+
+        # duplicate and dominated subsets, smallest first
+        for i in sorted(sets, key=lambda i: (len(sets[i]), i)):
+            if i not in sets:
+                continue
+            s = sets[i]
+            if not s:
+                drop_subset(i)
+                removed["dominated_subsets"] += 1
+                continue
+            rare = min(s, key=lambda e: (len(covering[e]), e))
+            for j in covering[rare]:
+                if j == i or len(sets[j]) < len(s) or (len(sets[j]) == len(s) and j > i):
+                    continue
+                if s <= sets[j]:
+                    drop_subset(i)
+                    removed["dominated_subsets"] += 1
+                    changed = True
+                    break
+
+        # dominated elements, rarest first (dropping f leaves the other degrees unchanged)
+        for e in sorted(covering, key=lambda e: (len(covering[e]), e)):
+            if e not in covering or not covering[e]:
+                continue
+            if len(covering[e]) > DOMINANCE_DEGREE:
+                break
+            # 从最小的子集开始求交，只剩 e 时停止
+            common = None
+            for j in sorted(covering[e], key=lambda j: len(sets[j])):
+                common = set(sets[j]) if common is None else common & sets[j]
+                if len(common) == 1:
+                    break
+            for f in common:
+                if f != e:
+                    drop_element(f)
+                    removed["dominated_elements"] += 1
+                    changed = True
+
+    subset_ids = sorted(i for i in sets if sets[i])
+    elements = sorted(covering)
+    renum = {e: k + 1 for k, e in enumerate(elements)}
+    kernel_subsets = [{renum[e] for e in sets[i]} for i in subset_ids]
+    return Kernel(set(range(1, len(elements) + 1)), kernel_subsets, subset_ids,
+                  sorted(forced), removed, time.time() - start)
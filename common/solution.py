@@ -0,0 +1,47 @@
+import numpy as np
+
+
+def parse_solution(fname, m):
+    """
+    Read a .sol file (its size, then the 1-based subset ids) of an
+    instance with m subsets. Returns the sorted 0-based ids; raises
+    ValueError if the file is malformed.
+    """
+    with open(fname) as f:
+        lines = [l.split() for l in f if l.strip()]
+    if not lines or len(lines[0]) != 1:
+        raise ValueError(f"{fname}: first line must hold the solution size.")
+    size = int(lines[0][0])
+    ids = sorted({int(i) - 1 for line in lines[1:] for i in line})
+    if len(ids) != size:
+        raise ValueError(f"{fname}: size {size} does not match its {len(ids)} distinct subsets.")
+    if ids and (ids[0] < 0 or ids[-1] >= m):
+        raise ValueError(f"{fname}: subset ids must be in [1, {m}].")
+    return ids
+
+
+def read_solution(fname, universe, subsets):
+    """
+    Read a .sol file and check that it covers universe. Returns the
+    sorted 0-based ids; raises ValueError if the file is malformed or is
+    not a cover.
+    """
+    ids = parse_solution(fname, len(subsets))
+    missing = set(universe).difference(*(subsets[i] for i in ids))
+    if missing:
+        raise ValueError(f"{fname}: not a cover, {len(missing)} element(s) uncovered.")
+    return ids
+
+
+def check_solution(fname, inst):
+    """
+    read_solution against a CSR Instance, without building its sets.
+    """
+    ids = parse_solution(fname, inst.m)
+    covered = np.zeros(inst.n + 1, dtype=bool)
+    if ids:
+        covered[np.concatenate([inst.subset(i) for i in ids])] = True
+    uncovered = inst.n - int(covered[1:].sum())
+    if uncovered:
+        raise ValueError(f"{fname}: not a cover, {uncovered} element(s) uncovered.")
+    return ids
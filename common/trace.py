@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+
+TRACE_MAGIC = b"SCTRACE\x01"
+RECORD = np.dtype([("t", "<f8"), ("q", "<i8")])
+
+
+class TraceRecorder:
+    """
+    (time, quality) records of a run, kept in a preallocated array that
+    doubles when full. Solvers record their improvements; heartbeat()
+    adds a record only if `every` seconds have passed since the last
+    one, and does nothing (not even read the clock) when every is 0.
+    """
+
+    def __init__(self, start=None, every=0.0, capacity=1024):
+        self.start = time.time() if start is None else start
+        self.every = every
+        self.rows = np.empty(capacity, dtype=RECORD)
+        self.size = 0
+
+    def record(self, q, t=None):
+        if t is None:
+            t = time.time() - self.start
+        if self.size == len(self.rows):
+            self.rows = np.concatenate((self.rows, np.empty(len(self.rows), dtype=RECORD)))
+        self.rows[self.size] = (t, q)
+        self.size += 1
+
+    def heartbeat(self, q):
+        if not self.every:
+            return
+        t = time.time() - self.start
+        if not self.size or t - self.rows["t"][self.size - 1] >= self.every:
+            self.record(q, t)
+
+    def __len__(self):
+        return self.size
+
+    def to_list(self):
+        rows = self.rows[:self.size]
+        return list(zip(rows["t"].tolist(), rows["q"].tolist()))
+
+
+def write_trace(path, trace, binary=False):
+    """
+    Write (time, quality) pairs as "t q" text lines, or as a magic
+    header followed by packed float64/int64 records.
+    """
+    if binary:
+        rows = np.array([tuple(r) for r in trace], dtype=RECORD)
+        with open(path, "wb") as f:
+            f.write(TRACE_MAGIC)
+            f.write(rows.tobytes())
+        return
+    with open(path, "w") as f:
+        for t, q in trace:
+            f.write(f"{t:.4f} {q}\n")
+
+
+def read_trace(path):
+    """Read a trace written in either format as a list of (time, quality)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(TRACE_MAGIC):
+        rows = np.frombuffer(data, RECORD, offset=len(TRACE_MAGIC))
+        return list(zip(rows["t"].tolist(), rows["q"].astype(float).tolist()))
+    trace = []
+    for line in data.decode().splitlines():
+        if line.strip():
+            t, q = map(float, line.split())
+            trace.append((t, q))
+    return trace
+
+
+def last_record(path, tail=256):
+    """
+    The final (time, quality) record of a trace, read by seeking to the
+    end of the file instead of parsing all of it. None if it is empty.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(TRACE_MAGIC))
+        end = f.seek(0, 2)
+        if head == TRACE_MAGIC:
+            if end < len(TRACE_MAGIC) + RECORD.itemsize:
+                return None
+            f.seek(end - RECORD.itemsize)
+            t, q = np.frombuffer(f.read(RECORD.itemsize), RECORD)[0].tolist()
+            return t, float(q)
+        while True:
+            f.seek(max(end - tail, 0))
+            lines = f.read().split(b"\n")
+            if end <= tail:
+                break
+            # the first line may be cut off: need at least one full line after it
+            if any(line.strip() for line in lines[1:]):
+                lines = lines[1:]
+                break
+            tail *= 4
+    for line in reversed(lines):
+        if line.strip():
+            t, q = map(float, line.split())
+            return t, q
+    return None
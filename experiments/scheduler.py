@@ -0,0 +1,224 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from common.instance import load_instance
+from common.solution import check_solution
+from solvers import SOLVERS, get_instance, solve, write_result
+
+GRACE = 60          # 截止时间之外，作业被强制结束前的额外秒数
+POLL = 0.5          # 检查超时作业的间隔（秒）
+DEFAULT_SEEDS = list(range(1, 21 * 10, 10))
+SEEDED = {"LS1", "LS2", "LS3"}     # 输出文件名带种子的算法
+
+
+# ======================== 作业网格 ========================
+def expand(names):
+    """Instance names, with ranges like small1-18 expanded."""
+    out = []
+    for name in names:
+        m = re.fullmatch(r"(\D+)(\d+)-(\d+)", name)
+        if m:
+            out += [f"{m.group(1)}{i}" for i in range(int(m.group(2)), int(m.group(3)) + 1)]
+        else:
+            out.append(name)
+    return out
+
+
+def make_grid(instances, algs, seeds, cutoffs):
+    """
+    One job per instance x algorithm x cutoff x seed. Approx and BnB
+    are deterministic and name their output without a seed, so they get
+    a single job (seed None) per instance and cutoff.
+    """
+    jobs = []
+    for inst in instances:
+        for alg in algs:
+            for cutoff in cutoffs:
+                for seed in (seeds if alg in SEEDED else [None]):
+                    jobs.append({"inst": inst, "alg": alg, "time": cutoff, "seed": seed})
+    return jobs
+
+
+def output_name(job):
+    name = f"{job['inst']}_{job['alg']}_{job['time']}"
+    if job["seed"] is not None:
+        name += f"_{job['seed']}"
+    return name
+
+
+def sol_path(job, out_dir):
+    return os.path.join(out_dir, output_name(job) + ".sol")
+
+
+def solution_size(job, data_dir, out_dir, instances):
+    """Size of the job's .sol if it exists and is a cover, else None."""
+    path = sol_path(job, out_dir)
+    if not os.path.exists(path):
+        return None
+    if job["inst"] not in instances:
+        instances[job["inst"]] = load_instance(os.path.join(data_dir, f"{job['inst']}.in"))
+    try:
+        return len(check_solution(path, instances[job["inst"]]))
+    except (OSError, ValueError):
+        return None
+
+
+def read_manifest(path):
+    """All records of a manifest, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ======================== 工作进程 ========================
+def worker(core, tasks, results, data_dir, out_dir):
+    """
+    Run jobs from tasks until None, in this process, pinned to one CPU.
+    The worker lives for the whole campaign, so parsed instances stay
+    cached across algorithms and seeds. Sends ("start", pid, job) and
+    ("done", pid, record) so the parent can enforce the timeouts.
+    """
+    if core is not None:
+        os.sched_setaffinity(0, {core})
+    for job in iter(tasks.get, None):
+        results.put(("start", os.getpid(), job))
+        record = dict(job, core=core)
+        path = os.path.join(data_dir, f"{job['inst']}.in")
+        try:
+            result = solve(job["alg"], path, job["time"], job["seed"])
+            write_result(result, output_name(job), out_dir)
+        except Exception as e:
+            record.update(status="failed", error=f"{type(e).__name__}: {e}")
+        else:
+            record.update(status="ok", size=result["size"], timings=result["timings"])
+            try:
+                check_solution(sol_path(job, out_dir), get_instance(path)[0])
+            except ValueError as e:
+                record.update(status="invalid", error=str(e))
+        results.put(("done", os.getpid(), record))
+
+
+# ======================== 调度 ========================
+def schedule(jobs, workers, data_dir="data", workdir=".", manifest=None, grace=GRACE, pin=True):
+    """
+    Run jobs on `workers` processes, writing results to <workdir>/output
+    like the solvers do, and skipping jobs whose .sol already exists and
+    is a valid cover, so an interrupted campaign resumes where it
+    stopped. Each finished job is appended as one JSON line to the
+    manifest (default: <workdir>/output/manifest.jsonl) as soon as it
+    ends. Returns the records of the jobs run.
+    """
+    data_dir = os.path.abspath(data_dir)
+    out_dir = os.path.join(os.path.abspath(workdir), "output")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = manifest or os.path.join(out_dir, "manifest.jsonl")
+
+    instances = {}
+    todo = [job for job in jobs if solution_size(job, data_dir, out_dir, instances) is None]
+    print(f"{len(jobs)} jobs, {len(jobs) - len(todo)} already done, {len(todo)} to run")
+    instances.clear()
+    if not todo:
+        return []
+
+    cores = [None]
+    if pin and hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    ctx = mp.get_context()
+    tasks, results = ctx.Queue(), ctx.Queue()
+    for job in todo:
+        tasks.put(job)
+    procs = {}          # pid -> (进程, CPU)
+    running = {}        # pid -> (作业, 开始时间)
+
+    def spawn(core):
+        tasks.put(None)
+        p = ctx.Process(target=worker, args=(core, tasks, results, data_dir, out_dir), daemon=True)
+        p.start()
+        procs[p.pid] = (p, core)
+
+    for k in range(max(1, min(workers, len(todo)))):
+        spawn(cores[k % len(cores)])
+
+    records = []
+    with open(manifest, "a") as f:
+        def finish(record, start):
+            record["elapsed"] = round(time.time() - start, 3)
+            record["finished"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            records.append(record)
+            seed = "" if record["seed"] is None else f" seed={record['seed']}"
+            print(f"[{len(records)}/{len(todo)}] {record['inst']} {record['alg']}{seed}: "
+                  f"{record['status']} size={record.get('size')} time={record['elapsed']:.2f}s")
+
+        def reap(now):
+            # 超时或意外退出的 worker：记录其作业，换一个新的 worker
+            for pid, (job, start) in list(running.items()):
+                p, core = procs[pid]
+                if p.is_alive() and now - start <= job["time"] + grace:
+                    continue
+                status = "timeout" if p.is_alive() else "failed"
+                p.kill()
+                p.join()
+                del procs[pid], running[pid]
+                finish(dict(job, core=core, status=status, error=f"worker exit code {p.exitcode}"), start)
+                spawn(core)
+
+        next_check = time.time() + POLL
+        while len(records) < len(todo):
+            idle = False
+            try:
+                kind, pid, payload = results.get(timeout=POLL)
+            except queue.Empty:
+                idle = True
+            else:
+                if kind == "start":
+                    running[pid] = (payload, time.time())
+                elif pid in running:
+                    finish(payload, running.pop(pid)[1])
+            # 不论是否收到消息，每个轮询周期都检查一次超时
+            now = time.time()
+            if idle or now >= next_check:
+                next_check = now + POLL
+                reap(now)
+            if idle and not any(p.is_alive() for p, _ in procs.values()):
+                print("Workers exited with jobs left unfinished")
+                break
+    for p, _ in procs.values():
+        p.join()
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an instance x algorithm x seed x cutoff grid in parallel")
+    parser.add_argument("--inst", nargs="+", required=True,
+                        help="Instance names; ranges like small1-18 are expanded")
+    parser.add_argument("--algs", nargs="+", required=True, choices=sorted(SOLVERS))
+    parser.add_argument("--seeds", nargs="+", type=int, default=DEFAULT_SEEDS,
+                        help="Seeds for LS1/LS2/LS3 (Approx and BnB run once)")
+    parser.add_argument("--time", nargs="+", type=int, required=True, help="Cutoff time(s) in seconds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Jobs run at once (default: all cores)")
+    parser.add_argument("--data", default=os.path.join(ROOT, "data"), help="Directory holding <inst>.in")
+    parser.add_argument("--workdir", default=ROOT, help="Results go to <workdir>/output")
+    parser.add_argument("--manifest", default=None, help="Results manifest (default: <workdir>/output/manifest.jsonl)")
+    parser.add_argument("--grace", type=float, default=GRACE,
+                        help="Seconds past the cutoff before a job is killed")
+    parser.add_argument("--no-pin", action="store_true", help="Do not pin workers to CPUs")
+    args = parser.parse_args()
+
+    jobs = make_grid(expand(args.inst), args.algs, args.seeds, args.time)
+    schedule(jobs, args.workers, args.data, args.workdir, args.manifest, args.grace, not args.no_pin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "bnb"), os.path.join(ROOT, "localsearch")]
+from common.greedy import greedy_cover_csr
+from common.instance import load_instance
+from common.trace import write_trace
+from bnb import branch_and_bound, write_solution_file, write_trace_file, write_stats_file
+from ls_algorithms import run_ls1, run_ls2, run_ls3
+
+CACHE_SIZE = 4      # 每个进程缓存的实例数
+
+# path -> (mtime_ns, Instance)，最近使用的在末尾
+_instances = OrderedDict()
+
+
+# ======================== 实例缓存 ========================
+def get_instance(path):
+    """
+    The CSR Instance at path, parsed once per process and reused until
+    the file changes; its Python sets are built by the first solver
+    that needs them and kept with it. Returns it with the seconds spent
+    loading (0 on a cache hit).
+    """
+    mtime = os.stat(path).st_mtime_ns
+    entry = _instances.get(path)
+    if entry is not None and entry[0] == mtime:
+        _instances.move_to_end(path)
+        return entry[1], 0.0
+    start = time.time()
+    inst = load_instance(path)
+    _instances[path] = (mtime, inst)
+    _instances.move_to_end(path)
+    while len(_instances) > CACHE_SIZE:
+        _instances.popitem(last=False)
+    return inst, time.time() - start
+
+
+# ======================== 求解器 ========================
+# Approx 和 BnB 直接读 CSR 数组，局部搜索需要 Python 集合
+def solve_approx(inst, cutoff, seed=None):
+    chosen = greedy_cover_csr(inst)
+    if chosen is None:
+        raise ValueError("the subsets do not cover the universe")
+    return sorted(i + 1 for i in chosen), [], {}
+
+
+def solve_bnb(inst, cutoff, seed=None, **options):
+    solution, _, trace, stats = branch_and_bound(inst.universe, None, cutoff, inst=inst, **options)
+    return [i + 1 for i in solution], trace, stats
+
+
+def solve_ls(run):
+    def solve(inst, cutoff, seed=None, **options):
+        np.random.seed(seed)
+        solution, trace = run(inst.universe, inst.to_sets(), cutoff, seed, **options)
+        return solution, trace, {}
+    return solve
+
+
+# 算法 -> 求解函数 (Instance, cutoff, seed, **options) -> (1-based 解, trace, stats)
+SOLVERS = {
+    "Approx": solve_approx,
+    "BnB": solve_bnb,
+    "LS1": solve_ls(run_ls1),
+    "LS2": solve_ls(run_ls2),
+    "LS3": solve_ls(run_ls3),
+}
+SETS_SOLVERS = {"LS1", "LS2", "LS3"}
+
+
+def solve(alg, path, cutoff, seed=None, **options):
+    """
+    Run one solver on the instance file at path, in this process.
+    Returns a dict with the cover size, the solution (1-based subset
+    ids), the trace, the solver's stats and timings in seconds: load
+    (0 when the instance and, for local search, its sets were cached),
+    solve and total.
+    """
+    start = time.time()
+    inst, load = get_instance(path)
+    if alg in SETS_SOLVERS:
+        t0 = time.time()
+        inst.to_sets()
+        load += time.time() - t0
+    t0 = time.time()
+    solution, trace, stats = SOLVERS[alg](inst, cutoff, seed, **options)
+    end = time.time()
+    return {
+        "alg": alg,
+        "size": len(solution),
+        "solution": solution,
+        "trace": trace,
+        "stats": stats,
+        "timings": {"load": round(load, 4), "solve": round(end - t0, 4), "total": round(end - start, 4)},
+    }
+
+
+def write_result(result, name, out_dir="output"):
+    """
+    Write a result under out_dir/<name> in the format of the solver's
+    own script: .sol for all, .trace for BnB and LS, .json for BnB.
+    """
+    if result["alg"] == "BnB":
+        write_solution_file(f"{name}.sol", [i - 1 for i in result["solution"]], result["size"], out_dir)
+        write_trace_file(f"{name}.trace", result["trace"], out_dir)
+        write_stats_file(f"{name}.json", result["stats"], out_dir)
+        return
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, f"{name}.sol"), "w") as f:
+        f.write(f"{result['size']}\n")
+        f.write(" ".join(map(str, result["solution"])) + "\n")
+    if result["alg"] != "Approx":
+        write_trace(os.path.join(out_dir, f"{name}.trace"), result["trace"])
@@ -1,56 +1,68 @@
 import os
+import sys
 import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import trace as trace_io
+from result_cache import ResultCache
+
+ALG_NAMES = {
+    "LS1": "Hill Climbing",
+    "LS2": "Simulated Annealing",
+    "LS3": "Weighted Local Search",
+}
+
+cache = None
+
 def read_trace(prefix):
-    trace = []
-    with open(prefix + '.trace') as f:
-        for line in f:
-            t, q = map(float, line.split())
-            trace.append((t, q))
-    return trace
-
-def time_to_quality(trace, target):
-    for t, q in trace:
-        if q <= target:
-            return t
-    return float('inf')
-
-def quality_at_time(trace, tpt):
-    best = float('inf')
-    for t, q in trace:
-        if t <= tpt and q < best:
-            best = q
-    return best if best < float('inf') else trace[0][1]
+    # text or binary .trace, through the results cache when there is one
+    if cache is None:
+        return trace_io.read_trace(prefix + '.trace')
+    return cache.trace(prefix + '.trace')
+
+def time_to_quality(trace, targets):
+    """
+    First time the trace reaches quality <= target, for an array of
+    targets (inf where it never does).
+    """
+    t, q = np.array(trace, dtype=float).T
+    best = np.minimum.accumulate(q)
+    # best is non-increasing: find the first index with best <= target
+    idx = np.searchsorted(-best, -np.asarray(targets, dtype=float), side='left')
+    return np.append(t, np.inf)[idx]
+
+def quality_at_time(trace, tpts):
+    """
+    Best quality recorded at or before each time in tpts (the first
+    record's quality before the trace starts).
+    """
+    t, q = np.array(trace, dtype=float).T
+    order = np.argsort(t, kind='stable')
+    best = np.minimum.accumulate(q[order])
+    idx = np.searchsorted(t[order], tpts, side='right') - 1
+    return np.where(idx >= 0, best[np.maximum(idx, 0)], q[0])
 
 def plot_qrt(inst, alg, opt, seeds, cutoff, q_stars, out_dir):
-    solve_times = {}
-    for q in q_stars:
-        thr = opt * (1 + q)
-        qt = []
-        for s in seeds:
-            fname = f"./output/{inst}_{alg}_{cutoff}_{s}"
-            trace = read_trace(fname)
-            qt.append(time_to_quality(trace, thr))
-        solve_times[q] = np.array(qt)
+    thrs = [opt * (1 + q) for q in q_stars]
+    # rows: seeds, columns: quality targets
+    times = np.array([time_to_quality(read_trace(f"./output/{inst}_{alg}_{cutoff}_{s}"), thrs)
+                      for s in seeds])
 
     max_time = 5
     grid = np.linspace(0, max_time, 200)
     plt.figure()
-    for q in q_stars:
-        times_q = solve_times[q]
+    for k, q in enumerate(q_stars):
+        times_q = times[:, k]
         print(times_q)
-        fracs = [(times_q <= t).mean() for t in grid]
+        fracs = np.searchsorted(np.sort(times_q), grid, side='right') / len(times_q)
         plt.plot(grid, fracs, label=f"q*={100*q:.1f}%")
     plt.xlabel("Time (s)")
     plt.ylabel("Fraction solved")
 
-    if alg == "LS1":
-        plt.title(f"QRTD: Hill Climbing on {inst}")
-    else:
-        plt.title(f"QRTD: Simulated Annealing on {inst}")
+    plt.title(f"QRTD: {ALG_NAMES.get(alg, alg)} on {inst}")
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
@@ -67,26 +79,18 @@ def plot_sqd(inst, alg, opt, seeds, cutoff, out_dir, num_points=200):
     times = np.linspace(0.1 * max_time, max_time, num_points)
     times = np.around(times, 3)
 
-    medians, q1, q3 = [], [], []
-    for t in times:
-        rels = []
-        for trace in traces:
-            q_best = quality_at_time(trace, t)
-            rels.append((q_best - opt) / opt)
-        rels = np.array(rels)
-        medians.append(np.median(rels))
-        q1.append(np.percentile(rels, 25))
-        q3.append(np.percentile(rels, 75))
+    # rows: seeds, columns: time points
+    rels = (np.array([quality_at_time(trace, times) for trace in traces]) - opt) / opt
+    medians = np.median(rels, axis=0)
+    q1 = np.percentile(rels, 25, axis=0)
+    q3 = np.percentile(rels, 75, axis=0)
 
     plt.figure()
     plt.fill_between(times, q1, q3, alpha=0.3, label='IQR')
     plt.plot(times, medians, label='Median RelErr')
     plt.xlabel("Time (s)")
     plt.ylabel("Relative error")
-    if alg == "LS1":
-        plt.title(f"SQD: Hill Climbing on {inst}")
-    else:
-        plt.title(f"SQD: Simulated Annealing on {inst}")
+    plt.title(f"SQD: {ALG_NAMES.get(alg, alg)} on {inst}")
     plt.grid(True)
     plt.tight_layout()
     plt.savefig(f"{out_dir}/sqd_{inst}_{alg}.png")
@@ -111,10 +115,7 @@ def plot_runtime_variation(inst, algs, opt, cutoff, seeds, out_dir):
             else:
                 conv_times.append(trace[-1][0])
         data.append(conv_times)
-        if alg == "LS1":
-            labels.append("Hill Climbing")
-        else:
-            labels.append("Simulated Annealing")
+        labels.append(ALG_NAMES.get(alg, alg))
 
     plt.boxplot(data, labels=labels)
     plt.xlabel("Algorithm")
@@ -135,19 +136,11 @@ def build_comprehensive_table(instances, algs, seeds, cutoff, opt_vals, out_dir)
             for s in seeds:
                 prefix = f"{inst}_{alg}_{cutoff}_{s}"
                 sol_path = os.path.join('./output', prefix + '.sol')
-                with open(sol_path) as fsol:
-                    q = int(fsol.readline().strip())
-                quals.append(q)
+                quals.append(cache.solution_size(sol_path))
                 trace_path = os.path.join('./output', prefix + '.trace')
-                if os.path.exists(trace_path):
-                    lt = 0.0
-                    with open(trace_path) as ftr:
-                        for line in ftr:
-                            t, _ = map(float, line.split())
-                            lt = t
-                    times.append(lt)
-                else:
-                    times.append(0.0)
+                # only the last timestamp is needed: read from the end of the file
+                last = cache.last_time(trace_path) if os.path.exists(trace_path) else np.nan
+                times.append(0.0 if np.isnan(last) else last)
             avg_q = np.mean(quals)
             avg_t = np.mean(times)
             relerr = (avg_q - opt) / opt if opt else None
@@ -165,34 +158,57 @@ def build_comprehensive_table(instances, algs, seeds, cutoff, opt_vals, out_dir)
     print(df.pivot(index='Dataset', columns='Algorithm', values=['AvgTime(s)','AvgCollection Size','RelErr']))
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument('--inst', nargs='+', required=True,
-                    help='List of instance base names (e.g., small1, large2)')
-parser.add_argument('--algs', nargs='+', default=['LS1','LS2'],
-                    help='Algorithms to evaluate')
-parser.add_argument('--seeds', nargs='+', type=int, default=list(range(1,21*10, 10)),
-                    help='Random seeds (default: 1-20)')
-parser.add_argument('--time', type=int, required=True,
-                    help='Time cutoff used in runs')
-parser.add_argument('--out_dir', default='./figures',
-                    help='Directory to save plots and table')
-args = parser.parse_args()
-
-os.makedirs(args.out_dir, exist_ok=True)
-opt_vals = {}
-for inst in args.inst:
-    out_file = os.path.join('./data/', f"{inst}.out")
-    with open(out_file) as f:
-        opt_vals[inst] = int(f.readline().strip())
-
-
-q_stars = [0.01, 0.05, 0.1]
-
-for inst in ["large1", "large10"]:
-    for alg in [a for a in args.algs if a.startswith('LS')]:
-        plot_qrt(inst, alg, opt_vals[inst], args.seeds, args.time, q_stars, args.out_dir)
-
-        plot_sqd(inst, alg, opt_vals[inst], args.seeds, args.time, args.out_dir)
-    plot_runtime_variation(inst, args.algs, opt_vals[inst], args.time, args.seeds, args.out_dir)
-
-build_comprehensive_table(args.inst, args.algs, args.seeds, args.time, opt_vals, args.out_dir)
\ No newline at end of file
+def main():
+    global cache
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--inst', nargs='+', required=True,
+                        help='List of instance base names (e.g., small1, large2)')
+    parser.add_argument('--algs', nargs='+', default=['LS1','LS2'],
+                        help='Algorithms to evaluate')
+    parser.add_argument('--seeds', nargs='+', type=int, default=list(range(1,21*10, 10)),
+                        help='Random seeds (default: 1-20)')
+    parser.add_argument('--time', type=int, required=True,
+                        help='Time cutoff used in runs')
+    parser.add_argument('--out_dir', default='./figures',
+                        help='Directory to save plots and table')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for parsing uncached outputs (default: all cores)')
+    parser.add_argument('--cache', default='./output/.eval_cache.npz',
+                        help='Parsed-results cache, refreshed only for changed files')
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    opt_vals = {}
+    for inst in args.inst:
+        out_file = os.path.join('./data/', f"{inst}.out")
+        with open(out_file) as f:
+            opt_vals[inst] = int(f.readline().strip())
+
+
+    q_stars = [0.01, 0.05, 0.1]
+    plot_insts = ["large1", "large10"]
+
+    # parse every output this run needs up front (in parallel on a cold cache)
+    cache = ResultCache(args.cache)
+    jobs = []
+    for inst in args.inst:
+        for alg in args.algs:
+            for s in args.seeds:
+                prefix = os.path.join('./output', f"{inst}_{alg}_{args.time}_{s}")
+                jobs.append((prefix + '.sol', 'sol'))
+                jobs.append((prefix + '.trace', 'trace' if inst in plot_insts else 'tail'))
+    cache.prefetch(jobs, args.workers)
+
+    for inst in plot_insts:
+        for alg in [a for a in args.algs if a.startswith('LS')]:
+            plot_qrt(inst, alg, opt_vals[inst], args.seeds, args.time, q_stars, args.out_dir)
+
+            plot_sqd(inst, alg, opt_vals[inst], args.seeds, args.time, args.out_dir)
+        plot_runtime_variation(inst, args.algs, opt_vals[inst], args.time, args.seeds, args.out_dir)
+
+    build_comprehensive_table(args.inst, args.algs, args.seeds, args.time, opt_vals, args.out_dir)
+    cache.save()
+
+
+if __name__ == "__main__":
+    main()
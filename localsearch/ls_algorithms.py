@@ -1,44 +1,115 @@
+"""
+Local search algorithms for set cover. The run_* functions share these
+keyword arguments:
+    report     called with each new best cover (sorted 1-based ids)
+    init       cover to start from instead of the greedy one
+    heartbeat  also record the best size every this many seconds
+    stats      dict that receives the iterations and the seconds run
+batch > 0 (LS1/LS2) scores that many moves at a time, see run_batched.
+"""
+import os
+import sys
 import time
 import numpy as np
 import math
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.greedy import greedy_cover
+from common import instance
+from common.trace import TraceRecorder
+
 def load_instance(fname):
-    with open(fname) as f:
-        lines = [l.strip() for l in f if l.strip() and not l.startswith('#')]
-    n, m = map(int, lines[0].split())
-    U = set(range(1, n+1))
-    subsets = []
-    for line in lines[1:]:
-        parts = list(map(int, line.split()))
-        subsets.append(set(parts[1:]))
-    return U, subsets
+    inst = instance.load_instance(fname)
+    return inst.universe, inst.to_sets()
 
 
 def run_approx(U, subsets):
     """
     Greedy approximation: pick subset covering max uncovered each step.
     """
-    uncovered = set(U)
-    solution = []
-    while uncovered:
-        best_idx = max(range(len(subsets)),
-                       key=lambda i: len(subsets[i] & uncovered))
-        solution.append(best_idx + 1)
-        uncovered -= subsets[best_idx]
-    return sorted(solution)
+    return sorted(i + 1 for i in greedy_cover(U, subsets))
+
+
+def record_stats(stats, iters, start):
+    """Fill the optional stats dict of a local search."""
+    if stats is not None:
+        stats.update(iterations=iters, seconds=round(time.time() - start, 4))
+
+
+def cover_counts(U, subsets, sol):
+    """
+    Per-element cover counts for a solution of 1-based subset ids.
+    Returns the count list (indexed by element) and the number of
+    elements of U left uncovered.
+    """
+    counts = [0] * (max(U, default=0) + 1)
+    for i in sol:
+        for e in subsets[i-1]:
+            counts[e] += 1
+    uncovered = sum(1 for e in U if counts[e] == 0)
+    return counts, uncovered
+
+
+def element_index(U, subsets):
+    """
+    Element -> 1-based ids of the subsets covering it.
+    """
+    index = [[] for _ in range(max(U, default=0) + 1)]
+    for i, s in enumerate(subsets, 1):
+        for e in s:
+            index[e].append(i)
+    return index
+
+
+def remove_subsets(counts, subsets, ids):
+    """
+    Take subsets out of the cover counts, touching only their elements.
+    Returns the elements this leaves uncovered.
+    """
+    lost = []
+    for i in ids:
+        for e in subsets[i-1]:
+            counts[e] -= 1
+            if counts[e] == 0:
+                lost.append(e)
+    return lost
+
+
+def add_subsets(counts, subsets, ids):
+    """
+    Put subsets into the cover counts. Returns the newly covered elements.
+    """
+    gained = []
+    for i in ids:
+        for e in subsets[i-1]:
+            if counts[e] == 0:
+                gained.append(e)
+            counts[e] += 1
+    return gained
 
 
-def run_ls1(U, subsets, cutoff, seed=None, max_no_improve=10000):
+def run_ls1(U, subsets, cutoff, seed=None, max_no_improve=10000, batch=0, report=None, init=None,
+            heartbeat=0, stats=None):
     """
     Hill-Climbing with 2-out/1-in swap neighborhood.
+    The incoming subset is drawn from those covering an element left
+    uncovered by the removal.
     """
+    if batch:
+        return run_batched(U, subsets, cutoff, seed, batch, False, max_no_improve, report, init, heartbeat,
+                           stats)
     np.random.seed(seed)
     start = time.time()
 
-    # Initial deterministic greedy cover
-    current = set(run_approx(U, subsets))
+    # Initial cover: the warm start or the deterministic greedy one
+    current = set(init) if init else set(run_approx(U, subsets))
+    counts, _ = cover_counts(U, subsets, current)
+    index = element_index(U, subsets)
     best = current.copy()
-    trace = [(0.0, len(best))]
+    trace = TraceRecorder(start, heartbeat)
+    trace.record(len(best), 0.0)
+    if report and init:
+        report(sorted(best))
     no_improve = 0
     iters = 0
     trace_freq = 100
@@ -49,103 +120,437 @@ def run_ls1(U, subsets, cutoff, seed=None, max_no_improve=10000):
         if len(current) < 2:
             break
         outs = np.random.choice(list(current), 2, replace=False)
-        cand_minus = current - set(outs)
-        ins_candidates = [i+1 for i in range(len(subsets)) if i+1 not in cand_minus]
-        ins = np.random.choice(ins_candidates)
-        cand = cand_minus | {ins}
-        # check coverage
-        if set().union(*(subsets[i-1] for i in cand)) == U:
-            if len(cand) < len(current):
-                current = cand
+        lost = remove_subsets(counts, subsets, outs)
+        if not lost:
+            # both sets were redundant
+            current = current - set(outs)
+            no_improve = 0
+        else:
+            e = lost[np.random.randint(len(lost))]
+            ins = index[e][np.random.randint(len(index[e]))]
+            # current covers U, so only lost elements can be newly covered
+            if len(add_subsets(counts, subsets, [ins])) == len(lost):
+                current = (current - set(outs)) | {ins}
                 no_improve = 0
             else:
+                remove_subsets(counts, subsets, [ins])
+                add_subsets(counts, subsets, outs)
                 no_improve += 1
-        else:
-            no_improve += 1
 
         # update best
         if len(current) < len(best):
             best = current.copy()
-            elapsed = time.time() - start
-            trace.append((elapsed, len(best)))
+            trace.record(len(best))
             no_improve = 0
-        
-        # periodic trace update
-        if iters % trace_freq == 0:
-            elapsed = time.time() - start
-            trace.append((elapsed, len(best)))
+            if report:
+                report(sorted(best))
 
+        # heartbeat
+        if iters % trace_freq == 0:
+            trace.heartbeat(len(best))
 
-    return sorted(best), trace
+    record_stats(stats, iters, start)
+    return sorted(best), trace.to_list()
 
 
-def run_ls2(U, subsets, cutoff, seed=None, max_no_improve=10000):
+def run_ls2(U, subsets, cutoff, seed=None, max_no_improve=10000, batch=0, report=None, init=None,
+            heartbeat=0, stats=None):
     """
     Simulated Annealing with penalty for uncovered elements,
     2-out/1-in neighbor, and SA-style acceptance.
+    The incoming subset is drawn from those covering an uncovered element.
+    The temperature decays with the wall clock; after max_no_improve
+    iterations without a new best it restarts from the best and reheats.
     """
+    if batch:
+        return run_batched(U, subsets, cutoff, seed, batch, True, max_no_improve, report, init, heartbeat,
+                           stats)
     np.random.seed(seed)
     start = time.time()
 
-    def objective(sol):
-        covered = set().union(*(subsets[i-1] for i in sol))
-        pen = len(U) - len(covered)
-        return len(sol) + 10000 * pen
+    penalty = 10000
 
-    # initialize from deterministic greedy
-    current = set(run_approx(U, subsets))
+    # initialize from the warm start or deterministic greedy
+    current = set(init) if init else set(run_approx(U, subsets))
+    counts, cur_unc = cover_counts(U, subsets, current)
+    uncovered = {e for e in U if counts[e] == 0}
+    index = element_index(U, subsets)
+    cur_obj = len(current) + penalty * cur_unc
     best = current.copy()
-    trace = [(0.0, len(best))]
+    best_obj, best_unc = cur_obj, cur_unc
+    trace = TraceRecorder(start, heartbeat)
+    trace.record(len(best), 0.0)
+    if report and init and best_unc == 0:
+        report(sorted(best))
     no_improve = 0
     iters = 0
-    T = 25.0 
-    alpha = 0.99 
+    T0, T_end = 25.0, 0.05
+    seg_start, T_hi = 0.0, T0
     trace_freq = 100
 
-    while time.time() - start < cutoff and no_improve < max_no_improve:
+    while True:
+        now = time.time() - start
+        if now >= cutoff:
+            break
         iters += 1
 
+        # restart from best and reheat when stalled
+        if no_improve >= max_no_improve:
+            current = best.copy()
+            counts, cur_unc = cover_counts(U, subsets, current)
+            uncovered = {e for e in U if counts[e] == 0}
+            cur_obj = best_obj
+            seg_start, T_hi = now, max(T0 * (1 - now / cutoff), T_end)
+            no_improve = 0
+        T = T_hi * (T_end / T_hi) ** ((now - seg_start) / (cutoff - seg_start))
+
         # propose 2-out/1-in neighbor
         if len(current) < 2:
             break
         outs = np.random.choice(list(current), size=2, replace=False)
         cand_minus = current - set(outs)
 
-        ins_cand = [i+1 for i in range(len(subsets)) if i+1 not in cand_minus]
-        if not ins_cand:
-            no_improve += 1
-            continue
-        ins = np.random.choice(ins_cand)
-        cand = cand_minus | {ins}
+        # target an element uncovered by the removal (or already uncovered)
+        lost = remove_subsets(counts, subsets, outs)
+        targets = lost or list(uncovered)
+        if targets:
+            e = targets[np.random.randint(len(targets))]
+            ins = index[e][np.random.randint(len(index[e]))]
+            gained = add_subsets(counts, subsets, [ins])
+            cand = cand_minus | {ins}
+        else:
+            ins, gained = None, []
+            cand = cand_minus
 
-        # evaluate and accept/reject
-        cur_obj = objective(current)
-        cand_obj = objective(cand)
+        # evaluate incrementally and accept/reject
+        cand_unc = cur_unc + len(lost) - len(gained)
+        cand_obj = len(cand) + penalty * cand_unc
         delta = cand_obj - cur_obj
         if delta <= 0 or np.random.random() < math.exp(-delta / max(T, 1e-8)):
             current = cand
-            cur_obj = cand_obj
+            cur_obj, cur_unc = cand_obj, cand_unc
+            uncovered.update(lost)
+            uncovered.difference_update(gained)
             no_improve = 0
         else:
+            if ins is not None:
+                remove_subsets(counts, subsets, [ins])
+            add_subsets(counts, subsets, outs)
             no_improve += 1
 
         # record improvement
-        if cur_obj < objective(best):
+        if cur_obj < best_obj:
             best = current.copy()
-            elapsed = time.time() - start
-            trace.append((elapsed, len(best)))
+            best_obj, best_unc = cur_obj, cur_unc
+            trace.record(len(best))
             no_improve = 0
+            if report and best_unc == 0:
+                report(sorted(best))
 
-        # periodic trace
+        # heartbeat
         if iters % trace_freq == 0:
-            elapsed = time.time() - start
-            trace.append((elapsed, len(best)))
+            trace.heartbeat(len(best))
 
-        # cool down
-        T *= alpha
-
-    covered = set().union(*(subsets[i-1] for i in best))
-    if len(covered) < len(U):
+    record_stats(stats, iters, start)
+    if best_unc > 0:
         best = set(run_approx(U, subsets))
 
-    return sorted(best), trace
+    return sorted(best), trace.to_list()
+
+
+def run_ls3(U, subsets, cutoff, seed=None, report=None, init=None, heartbeat=0, stats=None):
+    """
+    Weighted local search with configuration checking.
+    Elements gain weight while uncovered; each step swaps out the
+    cheapest subset and swaps in the best one covering a random
+    uncovered element. Subset scores are updated incrementally.
+    """
+    np.random.seed(seed)
+    start = time.time()
+
+    m = len(subsets)
+    sets = [list(s) for s in subsets]
+    index = [np.array(ids, dtype=np.int64) - 1 for ids in element_index(U, subsets)]
+    size = max(U, default=0) + 1
+    weight = [1] * size
+    counts = [0] * size
+    owner = [0] * size          # sum of covering subset ids; the owner when counts[e] == 1
+    score = np.zeros(m, dtype=np.int64)
+    conf = np.ones(m, dtype=bool)
+    stamp = np.zeros(m, dtype=np.int64)
+    # uncovered elements and the cover (0-based ids), each a list with a position map
+    uncovered, where = [], {}
+    chosen, slot = [], {}
+
+    def insert(items, pos, x):
+        pos[x] = len(items)
+        items.append(x)
+
+    def discard(items, pos, x):
+        k = pos.pop(x)
+        last = items.pop()
+        if last != x:
+            items[k] = last
+            pos[last] = k
+
+    def add(j):
+        gain = 0
+        for e in sets[j]:
+            c = counts[e]
+            if c == 0:
+                score[index[e]] -= weight[e]
+                conf[index[e]] = True
+                discard(uncovered, where, e)
+                gain += weight[e]
+            elif c == 1:
+                score[owner[e]] += weight[e]
+            counts[e] = c + 1
+            owner[e] += j
+        score[j] = -gain
+        insert(chosen, slot, j)
+
+    def remove(j):
+        loss = 0
+        for e in sets[j]:
+            c = counts[e] - 1
+            counts[e] = c
+            owner[e] -= j
+            if c == 0:
+                score[index[e]] += weight[e]
+                conf[index[e]] = True
+                insert(uncovered, where, e)
+                loss += weight[e]
+            elif c == 1:
+                score[owner[e]] -= weight[e]
+        score[j] = loss
+        discard(chosen, slot, j)
+        conf[j] = False
+
+    def oldest(ids):
+        # highest score, ties to the subset unchanged the longest
+        s = score[ids]
+        ids = ids[s == s.max()]
+        return int(ids[np.argmin(stamp[ids])])
+
+    def drop_redundant():
+        while True:
+            sol = np.array(chosen, dtype=np.int64)
+            redundant = sol[score[sol] == 0]
+            if len(redundant) == 0:
+                return
+            remove(oldest(redundant))
+
+    # Initial cover (warm start or deterministic greedy), without redundant subsets
+    for e in U:
+        insert(uncovered, where, e)
+        score[index[e]] += 1
+    for i in init or run_approx(U, subsets):
+        add(i - 1)
+    drop_redundant()
+    best = [j + 1 for j in chosen]
+    trace = TraceRecorder(start, heartbeat)
+    trace.record(len(best), 0.0)
+    if report:
+        report(sorted(best))
+    iters = 0
+    trace_freq = 100
+    tabu = -1
+
+    while time.time() - start < cutoff:
+        iters += 1
+        if not uncovered:
+            drop_redundant()
+            if len(chosen) < len(best):
+                best = [j + 1 for j in chosen]
+                trace.record(len(best))
+                if report:
+                    report(sorted(best))
+            if len(chosen) <= 1:
+                break
+            sol = np.array(chosen, dtype=np.int64)
+            # cover is complete: try with one subset fewer
+            j = oldest(sol)
+            remove(j)
+            stamp[j] = iters
+            continue
+
+        # swap out the cheapest subset other than the one just added
+        sol = np.array(chosen, dtype=np.int64)
+        if len(sol) > 1:
+            sol = sol[sol != tabu]
+        if len(sol):
+            j = oldest(sol)
+            remove(j)
+            stamp[j] = iters
+
+        # swap in the best subset covering a random uncovered element
+        e = uncovered[np.random.randint(len(uncovered))]
+        cand = index[e]
+        allowed = cand[conf[cand]]
+        j = oldest(allowed if len(allowed) else cand)
+        add(j)
+        stamp[j] = iters
+        tabu = j
+
+        # uncovered elements weigh more
+        for e in uncovered:
+            weight[e] += 1
+            score[index[e]] += 1
+
+        # heartbeat
+        if iters % trace_freq == 0:
+            trace.heartbeat(len(best))
+
+    record_stats(stats, iters, start)
+    return sorted(best), trace.to_list()
+
+
+def gather(offsets, elems, ids):
+    """
+    Elements of the given CSR rows, concatenated, with the position in
+    ids each one came from.
+    """
+    lo = offsets[ids]
+    lengths = offsets[ids + 1] - lo
+    owner = np.repeat(np.arange(len(ids)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    pos = np.arange(lengths.sum()) - np.repeat(starts - lo, lengths)
+    return elems[pos], owner
+
+
+def run_batched(U, subsets, cutoff, seed=None, batch=64, anneal=False, max_no_improve=10000,
+                report=None, init=None, heartbeat=0, stats=None):
+    """
+    LS1 (anneal=False) or LS2 (anneal=True) with the 2-out/1-in moves
+    drawn and scored `batch` at a time.
+
+    Random numbers come in one block per batch from a numpy Generator.
+    The uncovered counts of all candidate moves are computed with array
+    operations over the per-element cover count vector. Hill climbing
+    applies the best improving candidate, annealing the first one the
+    Metropolis rule accepts. The other candidates are discarded, since
+    the move changes the counts they were scored on.
+    """
+    rng = np.random.default_rng(seed)
+    start = time.time()
+
+    n = max(U, default=0)
+    inst = instance.from_rows(n, [np.fromiter(s, np.int64, len(s)) for s in subsets])
+    offsets, elems = inst.offsets, inst.elems
+    degree = np.diff(inst.elem_offsets)
+    span = n + 1
+    penalty = 10000
+
+    # initialize from the warm start or deterministic greedy
+    sol = np.array(sorted(init or run_approx(U, subsets)), dtype=np.int64) - 1
+    counts = np.bincount(gather(offsets, elems, sol)[0], minlength=span)
+    in_u = np.zeros(span, dtype=bool)
+    in_u[list(U)] = True
+    cur_unc = int((in_u & (counts == 0)).sum())
+    cur_obj = len(sol) + penalty * cur_unc
+    best, best_obj, best_unc = sol.copy(), cur_obj, cur_unc
+    trace = TraceRecorder(start, heartbeat)
+    trace.record(len(best), 0.0)
+    if report and init and best_unc == 0:
+        report(sorted(int(i) + 1 for i in best))
+    no_improve = 0
+    iters = 0
+    T0, T_end = 25.0, 0.05
+    seg_start, T_hi = 0.0, T0
+    trace_freq = 100
+    cand = np.arange(batch)
+
+    while True:
+        now = time.time() - start
+        if now >= cutoff or len(sol) < 2:
+            break
+        if no_improve >= max_no_improve:
+            if not anneal:
+                break
+            # restart from best and reheat when stalled
+            sol = best.copy()
+            counts = np.bincount(gather(offsets, elems, sol)[0], minlength=span)
+            cur_obj, cur_unc = best_obj, best_unc
+            seg_start, T_hi = now, max(T0 * (1 - now / cutoff), T_end)
+            no_improve = 0
+        iters += 1
+        r = rng.random((batch, 5))
+
+        # two distinct subsets out of the cover per candidate
+        s = len(sol)
+        a = (r[:, 0] * s).astype(np.int64)
+        b = (r[:, 1] * (s - 1)).astype(np.int64)
+        b += b >= a
+        out_e, out_k = gather(offsets, elems, np.concatenate((sol[a], sol[b])))
+        out_k %= batch
+
+        # elements each candidate's removal leaves uncovered
+        keys, mult = np.unique(out_k * span + out_e, return_counts=True)
+        key_e = keys % span
+        lost = counts[key_e] == mult
+        lost_e = key_e[lost]
+        lost_n = np.bincount(keys[lost] // span, minlength=batch)
+
+        # incoming subset: covers a random lost (or already uncovered) element
+        target = np.zeros(batch, dtype=np.int64)
+        has_target = lost_n > 0
+        first = np.cumsum(lost_n) - lost_n
+        target[has_target] = lost_e[(first + r[:, 2] * lost_n).astype(np.int64)[has_target]]
+        if anneal and cur_unc:
+            uncovered = np.flatnonzero(in_u & (counts == 0))
+            fill = ~has_target
+            target[fill] = uncovered[(r[fill, 2] * len(uncovered)).astype(np.int64)]
+            has_target[:] = True
+        choice = inst.elem_offsets[target] + (r[:, 3] * degree[target]).astype(np.int64)
+        ins = np.full(batch, -1, dtype=np.int64)
+        ins[has_target] = inst.elem_subsets[choice[has_target]]
+
+        # elements the incoming subset covers again
+        in_e, in_k = gather(offsets, elems, ins[has_target])
+        in_k = cand[has_target][in_k]
+        in_keys = in_k * span + in_e
+        pos = np.minimum(np.searchsorted(keys, in_keys), len(keys) - 1)
+        removed = np.where(keys[pos] == in_keys, mult[pos], 0)
+        gained = (counts[in_e] == removed) & in_u[in_e]
+        gained_n = np.bincount(in_k[gained], minlength=batch)
+
+        # score all candidates, then apply one
+        delta = has_target.astype(np.int64) - 2 + penalty * (lost_n - gained_n)
+        if anneal:
+            T = T_hi * (T_end / T_hi) ** ((now - seg_start) / (cutoff - seg_start))
+            ok = (delta <= 0) | (r[:, 4] < np.exp(-np.maximum(delta, 0) / max(T, 1e-8)))
+            pick = int(np.argmax(ok)) if ok.any() else -1
+        else:
+            ok = delta < 0
+            pick = int(np.argmin(delta)) if ok.any() else -1
+
+        if pick < 0:
+            no_improve += batch
+        else:
+            np.subtract.at(counts, gather(offsets, elems, sol[[a[pick], b[pick]]])[0], 1)
+            keep = np.ones(s, dtype=bool)
+            keep[[a[pick], b[pick]]] = False
+            sol = sol[keep]
+            if has_target[pick]:
+                counts[elems[offsets[ins[pick]]:offsets[ins[pick] + 1]]] += 1
+                sol = np.append(sol, ins[pick])
+            cur_unc += int(lost_n[pick] - gained_n[pick])
+            cur_obj = len(sol) + penalty * cur_unc
+            no_improve = 0
+
+        # record improvement
+        if cur_obj < best_obj:
+            best, best_obj, best_unc = sol.copy(), cur_obj, cur_unc
+            trace.record(len(best))
+            no_improve = 0
+            if report and best_unc == 0:
+                report(sorted(int(i) + 1 for i in best))
+
+        # heartbeat
+        if iters % trace_freq == 0:
+            trace.heartbeat(len(best))
+
+    record_stats(stats, iters, start)
+    if best_unc > 0:
+        return run_approx(U, subsets), trace.to_list()
+    return sorted(int(i) + 1 for i in best), trace.to_list()
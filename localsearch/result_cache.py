@@ -0,0 +1,123 @@
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from common import trace as trace_io
+
+COLD_PARALLEL = 64      # 待解析文件多于此数时多进程加载
+
+
+def parse_file(job):
+    """
+    Parse one output file. kind is "sol" (cover size), "trace" (all
+    records) or "tail" (last record only). Returns the cache entry.
+    """
+    path, kind = job
+    st = os.stat(path)
+    sol, last, rows = -1, np.nan, None
+    if kind == "sol":
+        with open(path) as f:
+            sol = int(f.readline().strip())
+    elif kind == "trace":
+        rows = np.array(trace_io.read_trace(path), dtype=float).reshape(-1, 2)
+        last = rows[-1, 0] if len(rows) else np.nan
+    else:
+        rec = trace_io.last_record(path)
+        last = rec[0] if rec else np.nan
+    return path, (st.st_mtime_ns, st.st_size, sol, last, rows)
+
+
+class ResultCache:
+    """
+    Parsed .sol/.trace files, stored as one NumPy archive keyed by path,
+    mtime and size, so a rerun only re-parses files that changed.
+    Entries are (mtime_ns, size, cover size, last trace time, trace
+    rows or None); a trace read only for its last time has no rows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                self.load()
+            except (OSError, ValueError, KeyError):
+                self.entries = {}
+
+    def load(self):
+        with np.load(self.path, allow_pickle=False) as z:
+            paths, mtimes, sizes, sols, lasts, rows, data = (
+                z[k] for k in ("paths", "mtimes", "sizes", "sols", "lasts", "rows", "data"))
+        starts = np.concatenate(([0], np.cumsum(np.maximum(rows, 0))))
+        for k, path in enumerate(paths.tolist()):
+            trace = data[starts[k]:starts[k + 1]] if rows[k] >= 0 else None
+            self.entries[path] = (int(mtimes[k]), int(sizes[k]), int(sols[k]), float(lasts[k]), trace)
+
+    def save(self):
+        if not self.dirty:
+            return
+        paths = sorted(self.entries)
+        ent = [self.entries[p] for p in paths]
+        rows = [e[4] for e in ent]
+        tmp = f"{self.path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp,
+                 paths=np.array(paths, dtype=str),
+                 mtimes=np.array([e[0] for e in ent], dtype=np.int64),
+                 sizes=np.array([e[1] for e in ent], dtype=np.int64),
+                 sols=np.array([e[2] for e in ent], dtype=np.int64),
+                 lasts=np.array([e[3] for e in ent], dtype=float),
+                 rows=np.array([-1 if r is None else len(r) for r in rows], dtype=np.int64),
+                 data=np.concatenate([r for r in rows if r is not None] or [np.zeros((0, 2))]))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def fresh(self, path, kind):
+        entry = self.entries.get(path)
+        if entry is None:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if (entry[0], entry[1]) != (st.st_mtime_ns, st.st_size):
+            return False
+        return kind != "trace" or entry[4] is not None
+
+    def prefetch(self, jobs, workers=None):
+        """Parse every stale (path, kind) in jobs, in parallel on a cold cache."""
+        stale = [(p, k) for p, k in jobs if os.path.exists(p) and not self.fresh(p, k)]
+        if not stale:
+            return
+        if len(stale) > COLD_PARALLEL and (workers or os.cpu_count() or 1) > 1:
+            with Pool(workers) as pool:
+                parsed = pool.map(parse_file, stale, chunksize=16)
+        else:
+            parsed = map(parse_file, stale)
+        for path, entry in parsed:
+            self.merge(path, entry)
+
+    def merge(self, path, entry):
+        old = self.entries.get(path)
+        if old is not None and old[:2] == entry[:2]:
+            # 同一文件的其他字段保留
+            entry = (entry[0], entry[1], max(entry[2], old[2]),
+                     old[3] if np.isnan(entry[3]) else entry[3],
+                     entry[4] if entry[4] is not None else old[4])
+        self.entries[path] = entry
+        self.dirty = True
+
+    def get(self, path, kind):
+        if not self.fresh(path, kind):
+            self.merge(*parse_file((path, kind)))
+        return self.entries[path]
+
+    def trace(self, path):
+        return [tuple(r) for r in self.get(path, "trace")[4].tolist()]
+
+    def solution_size(self, path):
+        return self.get(path, "sol")[2]
+
+    def last_time(self, path):
+        return self.get(path, "tail")[3]
@@ -1,4 +1,5 @@
 import argparse
+import multiprocessing as mp
 import time
 import os
 import numpy as np
@@ -6,7 +7,11 @@ from ls_algorithms import (
     load_instance,
     run_ls1,
     run_ls2,
+    run_ls3,
 )
+from common.reduce import reduce_instance
+from common.solution import read_solution
+from common.trace import write_trace
 
 def write_solution(sol_idx, prefix):
     with open(f"{prefix}.sol", 'w') as f:
@@ -14,41 +19,109 @@ def write_solution(sol_idx, prefix):
         f.write(' '.join(map(str, sol_idx)) + '\n')
 
 
-def write_trace(trace, prefix):
-    with open(f"{prefix}.trace", 'w') as f:
-        for t, q in trace:
-            f.write(f"{t:.4f} {q}\n")
+# Set once per process: in the parent for --jobs 1, in each pool worker otherwise.
+# Under fork the workers share the parent's copy of the instance (copy-on-write).
+_job = {}
 
 
-parser = argparse.ArgumentParser(description='Min Set Cover Solver')
-parser.add_argument('--inst', required=True,
-                    help='Instance base name (e.g., test1, small2, large3)')
-parser.add_argument('--alg', required=True,
-                    choices=['LS1', 'LS2'],
-                    help='Algorithm to run')
-parser.add_argument('--time', type=float, required=True, help='Cutoff time (s)')
-parser.add_argument('--seeds', nargs='+', type=int, default=list(range(1, 21*10, 10)),
-                    help='Random seeds for LS (default: 1-20)')
-args = parser.parse_args()
+def init_job(U, subsets, kernel, alg, cutoff, base, batch, init, heartbeat, binary):
+    _job.update(U=U, subsets=subsets, kernel=kernel, alg=alg, cutoff=cutoff, base=base,
+                batch=batch, init=init, heartbeat=heartbeat, binary=binary)
 
-base = args.inst
-in_file = os.path.join('../data/', f"{base}.in")
-if not os.path.isfile(in_file):
-    parser.error(f"Input file not found: {in_file}")
 
-U, subsets = load_instance(in_file)
-
-
-for seed in args.seeds:
+def run_seed(seed):
+    U, subsets, kernel = _job['U'], _job['subsets'], _job['kernel']
+    alg, cutoff, batch, init = _job['alg'], _job['cutoff'], _job['batch'], _job['init']
+    heartbeat = _job['heartbeat']
     np.random.seed(seed)
     start = time.time()
-    if args.alg == 'LS1':
-        sol_idx, trace = run_ls1(U, subsets, args.time, seed)
+    if alg == 'LS1':
+        sol_idx, trace = run_ls1(U, subsets, cutoff, seed, batch=batch, init=init, heartbeat=heartbeat)
+    elif alg == 'LS2':
+        sol_idx, trace = run_ls2(U, subsets, cutoff, seed, batch=batch, init=init, heartbeat=heartbeat)
     else:
-        sol_idx, trace = run_ls2(U, subsets, args.time, seed)
+        sol_idx, trace = run_ls3(U, subsets, cutoff, seed, init=init, heartbeat=heartbeat)
     elapsed = time.time() - start
+    if kernel is not None:
+        sol_idx = [i + 1 for i in kernel.lift([i - 1 for i in sol_idx])]
+        trace = kernel.lift_trace(trace)
 
-    prefix = f"./output/{base}_{args.alg}_{int(args.time)}_{seed}"
+    prefix = f"./output/{_job['base']}_{alg}_{int(cutoff)}_{seed}"
     write_solution(sol_idx, prefix)
-    write_trace(trace, prefix)
-    print(f"Done: alg={args.alg}, seed={seed}, size={len(sol_idx)}, time={elapsed:.2f}s")
+    write_trace(f"{prefix}.trace", trace, _job['binary'])
+    return seed, len(sol_idx), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Min Set Cover Solver')
+    parser.add_argument('--inst', required=True,
+                        help='Instance base name (e.g., test1, small2, large3)')
+    parser.add_argument('--alg', required=True,
+                        choices=['LS1', 'LS2', 'LS3'],
+                        help='Algorithm to run')
+    parser.add_argument('--time', type=float, required=True, help='Cutoff time (s)')
+    parser.add_argument('--seeds', nargs='+', type=int, default=list(range(1, 21*10, 10)),
+                        help='Random seeds for LS (default: 1-20)')
+    parser.add_argument('--reduce', action='store_true',
+                        help='Reduce the instance (dominated/essential subsets and elements) first')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of seeds run in parallel (default: 1)')
+    parser.add_argument('--batch', type=int, default=0,
+                        help='LS1/LS2: score this many moves per step with NumPy (default: 0, one at a time)')
+    parser.add_argument('--warm-start', metavar='FILE.sol',
+                        help='Start from this cover instead of the greedy one')
+    parser.add_argument('--heartbeat', type=float, default=0,
+                        help='Also record the best size every S seconds (default: 0, improvements only)')
+    parser.add_argument('--trace-format', choices=['text', 'binary'], default='text',
+                        help='Write .trace files as text lines or packed binary records')
+    parser.add_argument('--data', default='../data/',
+                        help='Directory holding <inst>.in (default: ../data/)')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    base = args.inst
+    in_file = os.path.join(args.data, f"{base}.in")
+    if not os.path.isfile(in_file):
+        parser.error(f"Input file not found: {in_file}")
+
+    U, subsets = load_instance(in_file)
+    init = None
+    if args.warm_start:
+        try:
+            init = read_solution(args.warm_start, U, subsets)
+        except (OSError, ValueError) as e:
+            parser.error(f"Invalid warm start: {e}")
+    kernel = None
+    if args.reduce:
+        kernel = reduce_instance(U, subsets)
+        U, subsets = kernel.universe, kernel.subsets
+        if init is not None:
+            init = kernel.project(init)
+    if init is not None:
+        init = [i + 1 for i in init]
+
+    job = (U, subsets, kernel, args.alg, args.time, base, args.batch, init, args.heartbeat,
+           args.trace_format == 'binary')
+    jobs = min(args.jobs, len(args.seeds))
+    if jobs == 1:
+        init_job(*job)
+        results = map(run_seed, args.seeds)
+        pool = None
+    else:
+        # fork hands the loaded instance to the workers without pickling it;
+        # elsewhere it is pickled once per worker, never per seed
+        methods = mp.get_all_start_methods()
+        ctx = mp.get_context('fork' if 'fork' in methods else None)
+        pool = ctx.Pool(jobs, initializer=init_job, initargs=job)
+        results = pool.imap_unordered(run_seed, args.seeds)
+
+    for seed, size, elapsed in results:
+        print(f"Done: alg={args.alg}, seed={seed}, size={size}, time={elapsed:.2f}s")
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+
+if __name__ == '__main__':
+    main()
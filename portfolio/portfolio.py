@@ -0,0 +1,171 @@
+import argparse
+import math
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "bnb"), os.path.join(ROOT, "localsearch")]
+from common.greedy import greedy_cover
+from bnb import MAX_OPEN, ORDERS, read_input_file, write_solution_file, write_trace_file, write_stats_file
+from parallel import GRACE, SharedSearch
+from ls_algorithms import run_ls1, run_ls2, run_ls3
+
+LOCAL_SEARCH = {"LS1": run_ls1, "LS2": run_ls2, "LS3": run_ls3}
+
+
+# ======================== 共享上界 ========================
+def publish(shared, start_time, solution):
+    """Offer a cover (0-based ids) to the portfolio if it beats the incumbent."""
+    best_value, lock, results = shared
+    with lock:
+        if len(solution) >= best_value.value:
+            return
+        best_value.value = len(solution)
+    results.put(("solution", time.time() - start_time, sorted(solution)))
+
+
+# ======================== 各求解器进程 ========================
+def approx_solver(universe, subsets, start_time, shared):
+    solution = greedy_cover(universe, subsets)
+    if solution is not None:
+        publish(shared, start_time, solution)
+    shared[2].put(("done", "Approx", False, {}))
+
+
+def ls_solver(alg, universe, subsets, cutoff_time, seed, start_time, shared):
+    remaining = max(cutoff_time - (time.time() - start_time), 0)
+    report = lambda sol: publish(shared, start_time, [i - 1 for i in sol])
+    LOCAL_SEARCH[alg](universe, subsets, remaining, seed, report=report)
+    shared[2].put(("done", f"{alg}/{seed}", False, {}))
+
+
+def bnb_solver(universe, subsets, cutoff_time, bounds, branching, order, max_open, table_size,
+               start_time, shared):
+    best_value, lock, results = shared
+    search = SharedSearch(universe, subsets, cutoff_time, bounds, branching, start_time, None,
+                          table_size, best_value, lock, results)
+    root = search.root()
+    res = search.visit(root)
+    # 只有真正处理过根节点才发下界；空的全集下界为 0
+    if res is not None:
+        results.put(("bound", res[0]))
+        search.run(root, order, max_open)
+    elif not search.timed_out and root[1] == 0:
+        results.put(("bound", 0))
+    stats = search.stats()
+    del stats["rate"]
+    # 搜索树走完（未超时）即证明当前上界最优
+    results.put(("done", "BnB", not search.timed_out, stats))
+
+
+# ======================== Portfolio ========================
+def portfolio(universe, subsets, cutoff_time, ls="LS3", seeds=(1,), bounds=("size",),
+              branching="subset", order="dfs", max_open=MAX_OPEN, table_size=0):
+    """
+    Run greedy, local search (one process per seed) and BnB at the same
+    time on one instance. Every solver publishes its improvements to an
+    incumbent size in shared memory, which BnB prunes against. Stops at
+    the cutoff, when BnB's root lower bound reaches the incumbent, or
+    when BnB finishes its tree, which proves the incumbent optimal.
+    Returns (solution0, size, trace, stats) like branch_and_bound.
+    """
+    start_time = time.time()
+    ctx = mp.get_context()
+    best_value = ctx.RawValue('i', len(subsets) + 1)
+    lock = ctx.Lock()
+    results = ctx.Queue()
+    shared = (best_value, lock, results)
+
+    procs = [ctx.Process(target=approx_solver, args=(universe, subsets, start_time, shared), daemon=True)]
+    procs += [ctx.Process(target=ls_solver,
+                          args=(ls, universe, subsets, cutoff_time, seed, start_time, shared),
+                          daemon=True)
+              for seed in seeds]
+    procs.append(ctx.Process(target=bnb_solver,
+                             args=(universe, subsets, cutoff_time, bounds, branching, order,
+                                   max_open, table_size, start_time, shared),
+                             daemon=True))
+    for p in procs:
+        p.start()
+
+    # === 收集解与下界，直到证明最优、全部结束或超时 ===
+    found = []
+    lower, optimal = 0, False
+    stats = {"solvers": {}}
+    deadline = start_time + cutoff_time + GRACE
+    while len(stats["solvers"]) < len(procs) and time.time() < deadline:
+        try:
+            msg = results.get(timeout=0.1)
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                break
+            continue
+        if msg[0] == "solution":
+            found.append(msg[1:])
+        elif msg[0] == "bound":
+            lower = msg[1]
+        else:
+            _, name, proved, solver_stats = msg
+            stats["solvers"][name] = solver_stats
+            # 只有未超时走完的 BnB 能证明最优
+            optimal = optimal or (name == "BnB" and proved and not solver_stats["timed_out"])
+        if optimal or (found and best_value.value <= lower):
+            optimal = True
+            break
+    for p in procs:
+        if p.is_alive():
+            p.terminate()
+        p.join(timeout=1)
+    while True:
+        try:
+            msg = results.get_nowait()
+        except queue.Empty:
+            break
+        if msg[0] == "solution":
+            found.append(msg[1:])
+
+    # === 按时间合并 trace ===
+    best_solution, best_size, trace = None, math.inf, []
+    for t, candidate in sorted(found, key=lambda f: f[0]):
+        if len(candidate) < best_size:
+            best_solution, best_size = candidate, len(candidate)
+            trace.append((t, best_size))
+    stats.update({"elapsed": round(time.time() - start_time, 3), "optimal": optimal,
+                  "lower_bound": best_size if optimal else lower,
+                  "improvements": len(trace)})
+    return best_solution, best_size, trace, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set cover portfolio: Approx + LS + BnB")
+    parser.add_argument("-inst", required=True, help="Instance file (e.g., data/large1.in)")
+    parser.add_argument("-time", type=int, required=True, help="Cutoff time (s)")
+    parser.add_argument("-ls", default="LS3", choices=sorted(LOCAL_SEARCH),
+                        help="Local search algorithm (default: LS3)")
+    parser.add_argument("-seeds", default="1",
+                        help="Comma-separated LS seeds, one process each (default: 1)")
+    parser.add_argument("-bound", default="size", help="BnB lower bounds, as in bnb.py")
+    parser.add_argument("-branch", default="subset", choices=["subset", "element"])
+    parser.add_argument("-order", default="dfs", choices=ORDERS)
+    parser.add_argument("-max_open", type=int, default=MAX_OPEN)
+    parser.add_argument("-tt", type=int, default=0, help="BnB transposition table size")
+    args = parser.parse_args()
+
+    universe, subsets = read_input_file(args.inst)
+    solution, size, trace, stats = portfolio(universe, subsets, args.time, args.ls,
+                                             [int(s) for s in args.seeds.split(",")],
+                                             args.bound.split(","), args.branch, args.order,
+                                             args.max_open, args.tt)
+
+    name = f"{os.path.splitext(os.path.basename(args.inst))[0]}_Portfolio_{args.time}"
+    write_solution_file(f"{name}.sol", solution, size)
+    write_trace_file(f"{name}.trace", trace)
+    write_stats_file(f"{name}.json", stats)
+    print(f"Done: size={size}, optimal={stats['optimal']}, time={stats['elapsed']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()